@@ -0,0 +1,77 @@
+import asyncio
+import random
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.base import BaseMessage
+
+from src.models.base import BaseLLM
+from src.models.fake_server import respond
+from src.models.openai import to_openai_messages
+
+STREAM_PIECE_SIZE = 40
+
+
+class MockChatModel:
+    """
+    Answers every prompt with the fake server's deterministic quiz JSON after `latency` seconds,
+    plus up to `jitter` seconds drawn from a seeded generator. Counts the calls it receives.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    async def _answer(self, prompt: Any) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency + self._rng.uniform(0, self.jitter))
+        return respond(to_openai_messages(prompt))
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> AIMessage:
+        self.calls += 1
+        return AIMessage(content=respond(to_openai_messages(prompt)))
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> AIMessage:
+        return AIMessage(content=await self._answer(prompt))
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        # The whole latency is paid before the first piece, as with a provider's time to first token
+        content = await self._answer(prompt)
+        for start in range(0, len(content), STREAM_PIECE_SIZE):
+            yield AIMessageChunk(content=content[start:start + STREAM_PIECE_SIZE])
+
+
+class MockLLM(BaseLLM):
+    """
+    A deterministic stand-in for a provider, going through BaseLLM's own invoke and stream paths.
+    It has no rate limiter or response cache, so benchmarks measure the pipeline rather than the budgets.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0, context_window: Optional[int] = 32768):
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.context_window = context_window
+        super().__init__("mock-llm")
+
+    def load_model(self, *args, **kwargs) -> MockChatModel:
+        return MockChatModel(self.latency, self.jitter, self.seed)
+
+    @property
+    def calls(self) -> int:
+        return self.model.calls
+
+    def generate(self, prompt: str, *args, **kwargs) -> str:
+        return self._invoke(prompt, *args, **kwargs).content
+
+    async def a_generate(self, prompt: str, *args, **kwargs) -> str:
+        response = await self._ainvoke(prompt, *args, **kwargs)
+        return response.content
+
+    async def a_batch(self, prompts: List[str], *args, **kwargs) -> List[BaseMessage]:
+        return list(await asyncio.gather(*(self._ainvoke(prompt, *args, **kwargs) for prompt in prompts)))
+
+    def get_model_name(self, *args, **kwargs) -> str:
+        return self.model_name
@@ -0,0 +1,177 @@
+"""
+End-to-end benchmark of the load -> generate -> correct pipeline on synthetic PDFs, with a mock LLM
+answering after a fixed latency. Every case runs in a fresh process so its peak RSS is its own.
+Results are written as JSON; with --baseline, metrics that got worse by more than --tolerance are
+listed and the exit code is 1:
+
+    python -m benchmarks.pipeline --pages 10 100 1000 --latency 0.05 --output bench.json
+    python -m benchmarks.pipeline --pages 10 100 --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.mock_llm import MockLLM
+from benchmarks.synthetic_pdf import make_pdf
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import Quiz, QuizGenerator
+
+DEFAULT_PAGES = [10, 100, 1000]
+DEFAULT_LATENCY = 0.05
+DEFAULT_TOLERANCE = 0.2
+
+# Metrics compared against a baseline, and whether a higher value is better
+COMPARED_METRICS = {
+    "pdf_load_seconds": False,
+    "chunking_seconds": False,
+    "pipeline_seconds": False,
+    "time_to_first_quiz_seconds": False,
+    "quizzes_per_second": True,
+    "peak_rss_mb": False,
+    "llm_calls_per_document": False,
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def run_case(pdf_path: str | Path, config: QuizGeneratorConfig, latency: float = DEFAULT_LATENCY, jitter: float = 0.0) -> Dict[str, Any]:
+    """Measures one PDF: loading and chunking on their own, then the whole pipeline as the server runs it."""
+    pdf_path = str(pdf_path)
+    model = MockLLM(latency=latency, jitter=jitter)
+    generator = QuizGenerator(config, model=model)
+
+    start = time.perf_counter()
+    pages = await generator.document_loaders["pdf"].aload_pages(pdf_path)
+    pdf_load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = generator.text_splitter.split_documents(pages)
+    chunking_seconds = time.perf_counter() - start
+
+    first_quiz_at: Optional[float] = None
+
+    def on_quiz(quiz: Quiz):
+        # The first quiz streams in before its chunk's response is complete
+        nonlocal first_quiz_at
+        if first_quiz_at is None:
+            first_quiz_at = time.perf_counter()
+
+    start = time.perf_counter()
+    quizzes = await generator.generate_and_correct(pdf_path, on_quiz=on_quiz)
+    pipeline_seconds = time.perf_counter() - start
+
+    return {
+        "pages": len(pages),
+        "chunks": len(chunks),
+        "quizzes": len(quizzes),
+        "pdf_load_seconds": round(pdf_load_seconds, 4),
+        "chunking_seconds": round(chunking_seconds, 4),
+        "pipeline_seconds": round(pipeline_seconds, 4),
+        "time_to_first_quiz_seconds": round(first_quiz_at - start, 4) if first_quiz_at is not None else None,
+        "quizzes_per_second": round(len(quizzes) / pipeline_seconds, 2) if pipeline_seconds else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        # One PDF per case, so every call the pipeline made was for this document
+        "llm_calls_per_document": model.calls,
+    }
+
+
+def _run_case_in_process(pdf_path: str, config: Dict[str, Any], latency: float, jitter: float) -> Dict[str, Any]:
+    return asyncio.run(run_case(pdf_path, QuizGeneratorConfig(**config), latency, jitter))
+
+
+def run_isolated(pdf_path: str | Path, config: QuizGeneratorConfig, latency: float, jitter: float = 0.0) -> Dict[str, Any]:
+    """Runs `run_case` in a freshly spawned process, so memory held by earlier cases doesn't count."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_case_in_process, str(pdf_path), config.model_dump(), latency, jitter).result()
+
+
+def compare(cases: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Lists the metrics of `cases` that are more than `tolerance` worse than the baseline case with the same page count."""
+    baseline_cases = {case["pages"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in cases:
+        previous = baseline_cases.get(case["pages"])
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{case['pages']} pages: {metric} went from {old} to {new} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the quiz pipeline on synthetic PDFs with a mock LLM")
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES, help="Page counts of the synthetic PDFs")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Seconds the mock LLM takes per call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per call, up to this much")
+    parser.add_argument("--max-concurrency", type=int, default=QuizGeneratorConfig().max_concurrency)
+    parser.add_argument("--pdf-workers", type=int, default=None, help="Processes extracting PDF pages, defaults to the CPU count")
+    parser.add_argument("--pdf-dir", default=os.path.join(tempfile.gettempdir(), "doc2quizz-bench"), help="Where synthetic PDFs are kept between runs")
+    parser.add_argument("--output", help="File to write the JSON results to, stdout when omitted")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    config = QuizGeneratorConfig(
+        api_key="benchmark",
+        max_concurrency=args.max_concurrency,
+        pdf_workers=args.pdf_workers,
+        cache_enabled=False,
+    )
+
+    cases = []
+    for pages in args.pages:
+        pdf_path = make_pdf(Path(args.pdf_dir) / f"synthetic-{pages}p.pdf", pages)
+        case = run_isolated(pdf_path, config, args.latency, args.jitter)
+        print(f"{pages} pages: {case['quizzes']} quizzes in {case['pipeline_seconds']}s", file=sys.stderr)
+        cases.append(case)
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "max_concurrency": args.max_concurrency,
+            "pdf_workers": args.pdf_workers,
+        },
+        "cases": cases,
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        regressions = compare(cases, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
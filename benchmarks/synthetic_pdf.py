@@ -0,0 +1,57 @@
+import random
+from pathlib import Path
+
+import fitz
+
+PARAGRAPHS_PER_PAGE = 4
+SENTENCES_PER_PARAGRAPH = 5
+VOCABULARY_SIZE = 3000
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ra", "tu", "si", "ve", "do", "pa", "gri", "sto", "len", "mor", "tha", "quen", "ber", "nal"]
+FILLER_WORDS = ["the", "of", "and", "a", "to", "in", "is", "that", "for", "with", "as", "by", "on", "from"]
+
+
+def _vocabulary(rng: random.Random) -> list:
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _sentence(rng: random.Random, vocabulary: list) -> str:
+    words = [rng.choice(vocabulary) if rng.random() < 0.6 else rng.choice(FILLER_WORDS) for _ in range(rng.randint(10, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def page_text(rng: random.Random, vocabulary: list, page: int) -> str:
+    paragraphs = [
+        " ".join(_sentence(rng, vocabulary) for _ in range(SENTENCES_PER_PARAGRAPH))
+        for _ in range(PARAGRAPHS_PER_PAGE)
+    ]
+    return f"Section {page + 1}\n\n" + "\n\n".join(paragraphs)
+
+
+def make_pdf(path: str | Path, pages: int, seed: int = 0) -> Path:
+    """
+    Writes a PDF of `pages` pages of seeded prose, the same bytes for the same arguments,
+    and returns its path. An existing file at `path` is reused.
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng)
+    document = fitz.open()
+    for page_number in range(pages):
+        page = document.new_page()
+        rect = page.rect + (50, 50, -50, -50)
+        page.insert_textbox(rect, page_text(rng, vocabulary, page_number), fontsize=9)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written beside the target and renamed, so an interrupted run never leaves a truncated PDF to reuse
+    tmp_path = path.with_name(path.name + ".tmp")
+    document.save(str(tmp_path), no_new_id=True)
+    document.close()
+    tmp_path.replace(path)
+    return path
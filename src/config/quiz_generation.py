@@ -3,5 +3,51 @@ from pydantic import BaseModel
 class QuizGeneratorConfig(BaseModel):
     api_key: str = None
     model: str = "gemini-pro"
+    # Provider serving `model`. With fallback providers, requests are routed to the fastest healthy one and
+    # hedged to the runner-up after hedge_after seconds (by default the primary's p95 latency)
+    provider: str = "gemini"
+    fallback_providers: list[str] = []
+    provider_models: dict[str, str] = {}
+    provider_api_keys: dict[str, str] = {}
+    hedge_after: float | None = None
+    # OpenAI-compatible endpoint for the "openai" provider, defaults to OPENAI_BASE_URL or the OpenAI API
+    openai_base_url: str | None = None
+    openai_timeout: float = 60.0
     model_kwargs: dict = {}
-    text_splitter_kwargs: dict = {}
\ No newline at end of file
+    text_splitter_kwargs: dict = {}
+    # Share of the model's context window a request may fill, prompt and answer included. When set, chunks are
+    # packed by tokens up to that budget (capped at max_chunk_tokens) instead of split by text_splitter_kwargs
+    chunk_context_share: float | None = None
+    max_chunk_tokens: int | None = None
+    questions_per_chunk: int = 2
+    # Total questions to spread over the document's chunks by their content density, instead of questions_per_chunk each.
+    # Chunks that are too short or look like references or a table of contents get none, as with skip_boilerplate_chunks.
+    target_quiz_count: int | None = None
+    skip_boilerplate_chunks: bool = False
+    # Ask providers that support it for schema-validated output instead of describing the JSON format in the prompt.
+    # Quizzes then arrive once the whole response is done rather than one by one as they stream in.
+    structured_output: bool = False
+    # Chunks sent together in one request under a single copy of the system prompt
+    chunks_per_request: int = 1
+    # Processes used to extract PDF pages in parallel, defaults to the CPU count
+    pdf_workers: int | None = None
+    max_concurrency: int = 4
+    # Jaccard similarity above which quizzes count as near-duplicates, None disables deduplication
+    dedup_threshold: float | None = 0.8
+    # Cosine similarity of embeddings (from embedding_model) above which quizzes count as paraphrases, None disables it
+    dedup_embedding_threshold: float | None = None
+    # Process-wide limits shared by every generator using the same provider model
+    requests_per_minute: int = 60
+    tokens_per_minute: int | None = None
+    max_llm_concurrency: int = 8
+    # Response cache keyed on (model, prompt, params); add a SQLite tier by setting cache_path
+    cache_enabled: bool = True
+    cache_path: str | None = None
+    cache_ttl: float | None = 24 * 60 * 60
+    cache_max_entries: int = 1024
+    # Local embedding model and on-disk chunk index used to generate quizzes on a topic
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_batch_size: int = 32
+    embedding_cache_path: str | None = ".cache/embeddings.sqlite"
+    index_path: str = ".cache/index"
+    topic_top_k: int = 8
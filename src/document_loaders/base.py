@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import AsyncIterator, List
 from abc import ABC, abstractmethod
 from langchain_core.documents import Document
 
@@ -7,4 +7,12 @@ from langchain_core.documents import Document
 class DocumentLoader(ABC):
     @abstractmethod
     async def aload(self, file_path: str) -> List[Document]:
-        pass
\ No newline at end of file
+        pass
+
+    async def aiter_chunks(self, file_path: str) -> AsyncIterator[Document]:
+        """
+        Yields the document's chunks as they become available. Loaders that can read
+        incrementally override this; the default falls back to `aload`.
+        """
+        for chunk in await self.aload(file_path):
+            yield chunk
@@ -0,0 +1,21 @@
+# Kept free of heavy imports: process pool workers import this module to extract pages.
+from typing import Any, Dict, List, Tuple
+
+import fitz
+
+
+def read_pdf_info(file_path: str) -> Tuple[int, Dict[str, Any]]:
+    """Returns the page count and the document metadata (string and int fields only)."""
+    with fitz.open(file_path) as doc:
+        metadata = {key: value for key, value in doc.metadata.items() if type(value) in (str, int)}
+        return len(doc), metadata
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Extracts the text of pages [start, end) in order."""
+    with fitz.open(file_path) as doc:
+        return [doc[number].get_text() for number in range(start, end)]
+
+
+def page_ranges(total_pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + pages_per_task, total_pages)) for start in range(0, total_pages, pages_per_task)]
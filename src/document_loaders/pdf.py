@@ -1,16 +1,111 @@
+import asyncio
 import logging
-from typing import List
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
 
 from langchain_core.documents import Document
-from langchain_community.document_loaders import PyMuPDFLoader
 
 from .base import DocumentLoader
+from .extract import extract_page_range, page_ranges, read_pdf_info
+
+DEFAULT_PAGES_PER_TASK = 16
+
+# Shared by every PDFLoader in the process, keyed by worker count
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    pool = _process_pools.get(max_workers)
+    if pool is None:
+        # Spawned rather than forked: the parent holds gRPC and HTTP client threads that don't survive a fork
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        _process_pools[max_workers] = pool
+    return pool
+
 
 class PDFLoader(DocumentLoader):
-    def __init__(self, text_splitter):
+    def __init__(self, text_splitter, max_workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK):
         self.text_splitter = text_splitter
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
 
     async def aload(self, file_path: str) -> List[Document]:
-        loader = PyMuPDFLoader(file_path=file_path)
-        doc_iter = await loader.aload()
-        return self.text_splitter.split_documents(doc_iter)
\ No newline at end of file
+        return [chunk async for chunk in self.aiter_chunks(file_path)]
+
+    async def aiter_chunks(self, file_path: str) -> AsyncIterator[Document]:
+        """
+        Yields chunks in document order, one page range at a time, numbering them with a `chunk_id`
+        in their metadata. Only the ranges being extracted are held in memory. With a splitter that packs
+        chunks across pages, each range's last chunk is held back and split again with the next range,
+        so packing isn't cut short at range boundaries.
+        """
+        carries_over = getattr(self.text_splitter, "packs_across_documents", False)
+        carried: List[Document] = []
+        chunk_id = 0
+        async for pages in self.aiter_pages(file_path):
+            # Splitting is CPU bound, keep it off the event loop
+            chunks = await asyncio.to_thread(self.text_splitter.split_documents, carried + pages)
+            if carries_over:
+                chunks, carried = chunks[:-1], chunks[-1:]
+            for chunk in chunks:
+                chunk.metadata["chunk_id"] = chunk_id
+                chunk_id += 1
+                yield chunk
+
+        for chunk in carried:
+            chunk.metadata["chunk_id"] = chunk_id
+            chunk_id += 1
+            yield chunk
+
+    async def aload_pages(self, file_path: str) -> List[Document]:
+        """Extracts every page of the PDF as a Document, in page order."""
+        return [page async for pages in self.aiter_pages(file_path) for page in pages]
+
+    async def aiter_pages(self, file_path: str) -> AsyncIterator[List[Document]]:
+        """
+        Yields the pages of the PDF one page range at a time, in order. When there are several
+        ranges, up to `max_workers` of them are extracted in parallel on a process pool.
+        """
+        file_path = str(file_path)
+        total_pages, metadata = await asyncio.to_thread(read_pdf_info, file_path)
+        ranges = page_ranges(total_pages, self.pages_per_task)
+
+        def to_documents(start: int, texts: List[str]) -> List[Document]:
+            return [
+                Document(
+                    page_content=text,
+                    metadata={
+                        "source": file_path,
+                        "file_path": file_path,
+                        "page": start + offset,
+                        "total_pages": total_pages,
+                        **metadata,
+                    },
+                )
+                for offset, text in enumerate(texts)
+            ]
+
+        if len(ranges) <= 1 or self.max_workers <= 1:
+            for start, end in ranges:
+                yield to_documents(start, await asyncio.to_thread(extract_page_range, file_path, start, end))
+            return
+
+        logging.info(f"Extracting {total_pages} pages in {len(ranges)} ranges with {self.max_workers} processes")
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool(self.max_workers)
+        remaining = deque(ranges)
+        in_flight = deque()
+        try:
+            while remaining or in_flight:
+                # Keep every worker busy while the caller consumes the earliest range
+                while remaining and len(in_flight) < self.max_workers:
+                    start, end = remaining.popleft()
+                    in_flight.append((start, loop.run_in_executor(pool, extract_page_range, file_path, start, end)))
+                start, future = in_flight.popleft()
+                yield to_documents(start, await future)
+        finally:
+            for _, future in in_flight:
+                future.cancel()
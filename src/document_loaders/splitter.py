@@ -0,0 +1,69 @@
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+
+class TokenBudgetSplitter:
+    """
+    Packs whole paragraphs into chunks of at most `chunk_tokens` tokens, as counted by `length_function`,
+    continuing across page boundaries. A chunk keeps the metadata of its first page and records its
+    last page as `page_end`.
+
+    Chunks can be fed back in with the next pages: their paragraphs split out again unchanged, so a
+    loader splitting a PDF range by range carries its last, partly filled chunk into the next range.
+    """
+    # Tells loaders that chunks span documents, so the last chunk of a batch should be carried over
+    packs_across_documents = True
+
+    def __init__(self, chunk_tokens: int, length_function: Callable[[str], int]):
+        if chunk_tokens < 1:
+            raise ValueError(f"chunk_tokens must be at least 1, got {chunk_tokens}")
+        self.chunk_tokens = chunk_tokens
+        self.length_function = length_function
+        # Paragraphs are only cut when one alone is over the budget, then at line and word boundaries
+        self._paragraph_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_tokens,
+            chunk_overlap=0,
+            length_function=length_function,
+        )
+
+    def _paragraphs(self, text: str) -> Iterator[Tuple[str, int]]:
+        for paragraph in text.split("\n\n"):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            size = self.length_function(paragraph)
+            if size <= self.chunk_tokens:
+                yield paragraph, size
+                continue
+            for piece in self._paragraph_splitter.split_text(paragraph):
+                yield piece, self.length_function(piece)
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        chunks: List[Document] = []
+        texts: List[str] = []
+        pages: List[Document] = []
+        tokens = 0
+
+        def flush():
+            metadata = dict(pages[0].metadata)
+            last = pages[-1].metadata
+            if "page" in last:
+                # A chunk carried over from an earlier batch already spans several pages
+                metadata["page_end"] = last.get("page_end", last["page"])
+            chunks.append(Document(page_content="\n\n".join(texts), metadata=metadata))
+
+        for document in documents:
+            for text, size in self._paragraphs(document.page_content):
+                if texts and tokens + size > self.chunk_tokens:
+                    flush()
+                    texts, pages, tokens = [], [], 0
+                texts.append(text)
+                tokens += size
+                if not pages or pages[-1] is not document:
+                    pages.append(document)
+
+        if texts:
+            flush()
+        return chunks
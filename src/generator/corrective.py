@@ -1,69 +1,137 @@
-from langchain.agents import AgentType, initialize_agent
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.tools import Tool
-from typing import List, Dict
+from langchain_core.documents import Document
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import List, Dict, Optional, Tuple
+import json
 import logging
 
-from src.generator.prompt import template_system_corrective
+from src.generator.prompt import template_batch_corrective
+from src.generator.scheduler import ChunkScheduler
+from src.models.base import BaseLLM
+from src.parser import Quiz
 
+DEFAULT_BATCH_SIZE = 10
+
+
+class QuizScore(BaseModel):
+    index: int
+    score: float
+    feedback: str = ""
 
 
 class Corrective:
-    def __init__(self, llm, quiz_generator, documents, score_threshold=0.7):
+    def __init__(
+        self,
+        llm: BaseLLM,
+        quiz_generator,
+        documents: List[Document],
+        score_threshold: float = 0.7,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = 4,
+        context_chunks: int = 0,
+    ):
         self.llm = llm
         self.quiz_generator = quiz_generator
         self.documents = documents
+        # Quizzes are scored against their own chunk plus `context_chunks` neighbours on each side
+        self.chunks = {document.metadata.get("chunk_id", index): document for index, document in enumerate(documents)}
+        self.context_chunks = context_chunks
         self.score_threshold = score_threshold
-        self.tools = self._create_tools()
-        self.agent = self._create_agent()
-
-    def _create_tools(self):
-        score_quiz_tool = Tool(
-            name="ScoreQuiz",
-            func=self._score_quiz,
-            description="Score a quiz question based on accuracy, relevance, and quality."
-        )
-        regenerate_quiz_tool = Tool(
-            name="RegenerateQuiz",
-            func=self._regenerate_quiz,
-            description="Request the QuizGenerator to regenerate a quiz question."
-        )
-        return [score_quiz_tool, regenerate_quiz_tool]
-
-    def _create_agent(self):
-        return initialize_agent(
-            self.tools,
-            self.llm,
-            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-            verbose=True
-        )
+        self.batch_size = batch_size
+        self.scheduler = ChunkScheduler(max_concurrency)
+        self.score_ta = TypeAdapter(List[QuizScore])
+
+    def _source_documents(self, chunk_id: Optional[int]) -> List[Document]:
+        """The quiz's source chunk and its neighbours, or every document when the source is unknown."""
+        if chunk_id is None or chunk_id not in self.chunks:
+            return self.documents
 
-    def _score_quiz(self, quiz: Dict):
-        prompt = PromptTemplate(
-            input_variables=["document", "quiz_content"],
-            template=template_system_corrective
+        neighbours = range(chunk_id - self.context_chunks, chunk_id + self.context_chunks + 1)
+        return [self.chunks[neighbour] for neighbour in neighbours if neighbour in self.chunks]
+
+    def _quiz_source_documents(self, quiz: Quiz) -> List[Document]:
+        return self._source_documents(quiz.source.chunk_id if quiz.source is not None else None)
+
+    def _render_source(self, chunk_id: Optional[int]) -> str:
+        return "\n\n".join(document.page_content for document in self._source_documents(chunk_id))
+
+    async def _score_batch(self, quizzes: List[Quiz], chunk_id: Optional[int] = None) -> Dict[int, QuizScore]:
+        """
+        Scores several quizzes from the same chunk with a single LLM call, sending only that chunk's text.
+        Returns the parsed scores by position in `quizzes`.
+        """
+        quiz_content = json.dumps(
+            [{"index": index, **quiz.model_dump(exclude={"source"})} for index, quiz in enumerate(quizzes)],
+            indent=2,
         )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        return chain.run(document=self.documents, quiz_content=quiz)
-
-    async def _regenerate_quiz(self, feedback: str):
-        return await self.quiz_generator.generate_from_documents(self.documents, feedback)
-
-    async def correct_quizzes(self, quizzes: List[Dict]) -> List[Dict]:
-        corrected_quizzes = []
-        for quiz in quizzes:
-            score_result = await self.agent.arun(f"Score this quiz: {quiz}")
-            
-            # Extract overall score from the result
-            overall_score = float(score_result.split('Overall Score:')[1].split('\n')[0].strip())
-            
-            if overall_score >= self.score_threshold:
-                corrected_quizzes.append(quiz)
-            else:
-                logging.info(f"Quiz needs regeneration. Score: {overall_score}. Feedback: {score_result}")
-                new_quiz = await self._regenerate_quiz(score_result)
-                corrected_quizzes.append(new_quiz)
-        
+        prompt = template_batch_corrective.format(document=self._render_source(chunk_id), quizzes=quiz_content)
+        response = await self.llm.a_generate(prompt)
+
+        content = response[response.find("["): response.rfind("]") + 1]
+        try:
+            scores = self.score_ta.validate_json(content)
+        except ValidationError as e:
+            logging.error(f"Could not parse quiz scores: {e}")
+            return {}
+
+        return {score.index: score for score in scores if 0 <= score.index < len(quizzes)}
+
+    def _make_batches(self, quizzes: List[Quiz]) -> List[Tuple[Optional[int], List[int]]]:
+        """Groups quiz positions by source chunk, at most `batch_size` quizzes per batch."""
+        groups: Dict[Optional[int], List[int]] = {}
+        for index, quiz in enumerate(quizzes):
+            chunk_id = quiz.source.chunk_id if quiz.source is not None else None
+            groups.setdefault(chunk_id, []).append(index)
+
+        return [
+            (chunk_id, indices[start: start + self.batch_size])
+            for chunk_id, indices in groups.items()
+            for start in range(0, len(indices), self.batch_size)
+        ]
+
+    async def score_quizzes(self, quizzes: List[Quiz]) -> List[Optional[QuizScore]]:
+        """
+        Scores every quiz against its source chunk, packing up to `batch_size` quizzes from the same chunk
+        per prompt and running the batches concurrently. Quizzes whose score could not be obtained get None.
+        """
+        scores: List[Optional[QuizScore]] = [None] * len(quizzes)
+
+        async def score_batch(batch: Tuple[Optional[int], List[int]]) -> Dict[int, QuizScore]:
+            chunk_id, indices = batch
+            return await self._score_batch([quizzes[index] for index in indices], chunk_id)
+
+        async for batch in self.scheduler.run(self._make_batches(quizzes), score_batch):
+            if not batch.ok:
+                continue
+            _, indices = batch.item
+            for position, score in batch.result.items():
+                scores[indices[position]] = score
+
+        return scores
+
+    async def correct_quizzes(self, quizzes: List[Quiz]) -> List[Quiz]:
+        scores = await self.score_quizzes(quizzes)
+
+        corrected_quizzes = list(quizzes)
+        rejected = []
+        for index, (quiz, score) in enumerate(zip(quizzes, scores)):
+            if score is None:
+                # Keep quizzes the scorer couldn't judge rather than dropping them
+                logging.warning(f"No score for quiz, keeping it: {quiz.question}")
+            elif score.score < self.score_threshold:
+                logging.info(f"Quiz needs regeneration. Score: {score.score}. Feedback: {score.feedback}")
+                rejected.append(index)
+
+        # Every rejected quiz is replaced in one concurrent round of small, single-quiz calls
+        if rejected:
+            replacements = await self.quiz_generator.regenerate_quizzes([
+                (quizzes[index], self._quiz_source_documents(quizzes[index]), scores[index].feedback)
+                for index in rejected
+            ])
+            for index, replacement in zip(rejected, replacements):
+                if replacement is None:
+                    # A failed regeneration shouldn't cost a quiz, the rejected one is better than none
+                    logging.warning(f"Could not regenerate quiz, keeping it: {quizzes[index].question}")
+                    continue
+                corrected_quizzes[index] = replacement
+
         return corrected_quizzes
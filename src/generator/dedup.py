@@ -0,0 +1,136 @@
+import logging
+import re
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.models.base import BaseEmbeddingModel
+from src.parser import Quiz
+
+MERSENNE_PRIME = (1 << 31) - 1
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def quiz_text(quiz: Quiz) -> str:
+    # Options are sorted so the same question with shuffled options still matches
+    return " ".join([quiz.question, *sorted(quiz.options)])
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    words = WORD_PATTERN.findall(text.casefold())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[start: start + size]) for start in range(len(words) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class QuizDeduplicator:
+    """
+    Drops near-duplicate quizzes in roughly linear time. Quizzes are shingled on their question and
+    options, MinHash signatures are bucketed with LSH, and only quizzes sharing a bucket are compared.
+    With an embedding model, quizzes whose embeddings are close enough are also treated as duplicates,
+    which catches paraphrases that share few words. Embeddings are bucketed the same way, by the signs
+    of their projections on random hyperplanes, so only embeddings sharing a bucket are compared.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        embedding_model: Optional[BaseEmbeddingModel] = None,
+        embedding_threshold: float = 0.92,
+        embedding_bands: int = 8,
+        embedding_bits: int = 8,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.embedding_model = embedding_model
+        self.embedding_threshold = embedding_threshold
+        self.embedding_bands = embedding_bands
+        self.embedding_bits = embedding_bits
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+    def signature(self, shingle_set: Set[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.int64, count=len(shingle_set))
+        hashes %= MERSENNE_PRIME
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    def embedding_keys(self, embeddings: np.ndarray) -> List[List[Tuple[int, bytes]]]:
+        """
+        Bucket keys of each embedding, one per band of `embedding_bits` hyperplanes. Two embeddings at
+        cosine similarity 0.92 share at least one of 8 bands of 8 bits about 96% of the time.
+        """
+        planes = np.random.default_rng(self.seed).standard_normal((self.embedding_bands * self.embedding_bits, embeddings.shape[1]))
+        bits = (embeddings @ planes.T) > 0
+        return [
+            [(band, np.packbits(row[band * self.embedding_bits: (band + 1) * self.embedding_bits]).tobytes()) for band in range(self.embedding_bands)]
+            for row in bits
+        ]
+
+    def deduplicate(self, quizzes: List[Quiz], embeddings: Optional[np.ndarray] = None) -> List[Quiz]:
+        """Keeps the first quiz of every group of near-duplicates, preserving order."""
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        embedding_buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        kept: List[int] = []
+        kept_shingles: List[Set[str]] = []
+
+        embedding_keys = None
+        if embeddings is not None:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+            embedding_keys = self.embedding_keys(embeddings)
+
+        for index, quiz in enumerate(quizzes):
+            shingle_set = shingles(quiz_text(quiz), self.shingle_size)
+            signature = self.signature(shingle_set)
+            keys = [(band, signature[band * self.rows: (band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+            candidates = {position for key in keys for position in buckets.get(key, ())}
+            duplicate = any(jaccard(shingle_set, kept_shingles[position]) >= self.threshold for position in candidates)
+
+            if not duplicate and embedding_keys is not None:
+                candidates = sorted({position for key in embedding_keys[index] for position in embedding_buckets.get(key, ())})
+                if candidates:
+                    similarities = embeddings[[kept[position] for position in candidates]] @ embeddings[index]
+                    duplicate = bool(similarities.max() >= self.embedding_threshold)
+
+            if duplicate:
+                continue
+
+            position = len(kept)
+            kept.append(index)
+            kept_shingles.append(shingle_set)
+            for key in keys:
+                buckets.setdefault(key, []).append(position)
+            if embedding_keys is not None:
+                for key in embedding_keys[index]:
+                    embedding_buckets.setdefault(key, []).append(position)
+
+        if len(kept) < len(quizzes):
+            logging.info(f"Dropped {len(quizzes) - len(kept)} near-duplicate quizzes")
+        return [quizzes[index] for index in kept]
+
+    async def adeduplicate(self, quizzes: List[Quiz], embedding_model: Optional[BaseEmbeddingModel] = None) -> List[Quiz]:
+        """Like `deduplicate`, embedding the quizzes with `embedding_model` (by default the deduplicator's own) if there is one."""
+        embedding_model = embedding_model or self.embedding_model
+        embeddings = None
+        if embedding_model is not None and quizzes:
+            embeddings = np.asarray(await embedding_model.a_embed_texts([quiz_text(quiz) for quiz in quizzes]), dtype=np.float32)
+        return self.deduplicate(quizzes, embeddings)
@@ -1,5 +1,8 @@
+import asyncio
+import copy
 import logging
-from typing import List, Literal
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List, Literal, Optional, Sized, Tuple
 from pathlib import Path
 
 from langchain_core.documents import Document
@@ -8,43 +11,331 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from src.generator.corrective import Corrective
-from src.generator.prompt import template_system_prompt, template_user_document, template_output
-from src.parser import Quiz, QuizParse
+from src.generator.dedup import QuizDeduplicator
+from src.generator.planner import ChunkPlanner
+from src.generator.prompt import template_system_prompt, template_user_document, template_user_documents, template_user_regenerate, template_output
+from src.generator.scheduler import ChunkResult, ChunkScheduler
+from src.parser import PackedQuiz, PackedQuizList, Quiz, QuizContent, QuizList, QuizParse, QuizSource, QuizValidator
 from src.config.quiz_generation import QuizGeneratorConfig
 from src.document_loaders.pdf import PDFLoader
-from src.models import get_llm_model
+from src.document_loaders.splitter import TokenBudgetSplitter
+from src.models import BaseLLM, get_llm_model
+from src.models.embedding import EmbeddingCache, SentenceTransformerEmbedding
+from src.retrieval import ChunkRetriever
 
 DEFAULT_MODEL_NAME = "gemini-pro"
 
+# Chunks can be a loaded list or a stream that is still being parsed
+Documents = Iterable[Document] | AsyncIterable[Document]
+
+# Called with (chunks done, chunks total, quizzes generated so far) after every chunk.
+# While a PDF is still being streamed, the total is estimated from the share of its pages read so far.
+ProgressCallback = Callable[[int, int, List[Quiz]], None]
+
+# Tokens reserved in a request's budget for each quiz the model writes
+OUTPUT_TOKENS_PER_QUIZ = 250
+
+# Settings that can change per request without rebuilding the model client or the loaders
+OVERRIDABLE_SETTINGS = {"questions_per_chunk", "max_concurrency", "target_quiz_count"}
+
+
+async def _number_chunks(documents: Documents) -> AsyncIterator[Document]:
+    """Gives documents without a `chunk_id` their position in the stream, as the loaders do."""
+    index = 0
+    if isinstance(documents, AsyncIterable):
+        async for document in documents:
+            document.metadata.setdefault("chunk_id", index)
+            index += 1
+            yield document
+    else:
+        for document in documents:
+            document.metadata.setdefault("chunk_id", index)
+            index += 1
+            yield document
+
+
+async def _group_chunks(documents: AsyncIterator[Document], size: int) -> AsyncIterator[List[Document]]:
+    group = []
+    async for document in documents:
+        group.append(document)
+        if len(group) == size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def _estimate_chunk_total(chunks_read: int, last: Optional[Document]) -> int:
+    """Extrapolates the number of chunks of a partly read PDF from the pages its first chunks cover."""
+    if last is None:
+        return chunks_read
+    pages_read = last.metadata.get("page_end", last.metadata.get("page", 0)) + 1
+    total_pages = last.metadata.get("total_pages")
+    if not total_pages or pages_read <= 0:
+        return chunks_read
+    return max(chunks_read, round(chunks_read * total_pages / pages_read))
+
+
+def _chunk_source(document: Document) -> QuizSource:
+    # Record which chunk and pages each quiz came from, so it can be scored against that chunk alone
+    page = document.metadata.get("page")
+    return QuizSource(chunk_id=document.metadata["chunk_id"], page_start=page, page_end=document.metadata.get("page_end", page))
+
+
 class QuizGenerator:
-    def __init__(self, config: QuizGeneratorConfig):
+    def __init__(self, config: QuizGeneratorConfig, model: Optional[BaseLLM] = None):
         self.config = config
-        self.text_splitter = RecursiveCharacterTextSplitter(**config.text_splitter_kwargs)
         self.parser = QuizParse()
+        self.validator = QuizValidator()
+        self.deduplicator = None
+        if config.dedup_threshold:
+            embedding_options = {} if config.dedup_embedding_threshold is None else {"embedding_threshold": config.dedup_embedding_threshold}
+            self.deduplicator = QuizDeduplicator(config.dedup_threshold, **embedding_options)
         self.model_name = config.model or DEFAULT_MODEL_NAME
-        
+        self.scheduler = ChunkScheduler(config.max_concurrency)
+        self.planner = ChunkPlanner()
+        # Lazily built resources shared with the generator's per-request copies
+        self._shared = {}
+        self._shared_lock = asyncio.Lock()
+
+        if model is None:
+            provider = "router" if config.fallback_providers else config.provider
+            model = get_llm_model(provider)(config=config, model=self.model_name)
+        self.model = model
+
+        self.structured_output = config.structured_output and self.model.supports_structured_output
+        if config.structured_output and not self.structured_output:
+            logging.warning(f"{self.model_name} has no native structured output, describing the format in the prompt instead")
+
+        # Create the prompt template once, every chunk is formatted with it
+        system_prompt = self.parser.format(template_system_prompt, structured=self.structured_output)
+        self.prompt_template = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("user", template_user_document)
+        ])
+        self.regenerate_template = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("user", template_user_regenerate)
+        ])
+        self.packed_template = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("user", template_user_documents)
+        ])
+
+        self.text_splitter = self._build_text_splitter()
         self.document_loaders = {
-            'pdf': PDFLoader(self.text_splitter),
+            'pdf': PDFLoader(self.text_splitter, max_workers=config.pdf_workers),
             # 'other_loader': OtherLoaderClass
         }
-        self.model = get_llm_model("gemini")(config=config, model=self.model_name)
 
-    async def load_document(self, file_path: str, file_type: Literal["pdf"] = "pdf") -> List[Document]:
-        logging.info(f"Loading document from path: {file_path}")
+    def _build_text_splitter(self):
+        share = self.config.chunk_context_share
+        if share is None:
+            return RecursiveCharacterTextSplitter(**self.config.text_splitter_kwargs)
+        if self.model.context_window is None:
+            logging.warning(f"Context window of {self.model_name} is unknown, splitting by text_splitter_kwargs instead")
+            return RecursiveCharacterTextSplitter(**self.config.text_splitter_kwargs)
+
+        # Whatever the share leaves after the prompt and the expected answers is split between the request's chunks
+        chunks_per_request = max(1, self.config.chunks_per_request)
+        template = self.packed_template if chunks_per_request > 1 else self.prompt_template
+        prompt_tokens = self.model.count_tokens(template.format(document="", documents="", number=self.config.questions_per_chunk))
+        output_tokens = chunks_per_request * self.config.questions_per_chunk * OUTPUT_TOKENS_PER_QUIZ
+        chunk_tokens = (int(self.model.context_window * share) - prompt_tokens - output_tokens) // chunks_per_request
+        if self.config.max_chunk_tokens is not None:
+            chunk_tokens = min(chunk_tokens, self.config.max_chunk_tokens)
+        if chunk_tokens < 1:
+            raise ValueError(f"chunk_context_share={share} leaves no room for a chunk in the {self.model.context_window} token context of {self.model_name}")
+
+        logging.info(f"Packing chunks up to {chunk_tokens} tokens for {self.model_name}")
+        return TokenBudgetSplitter(chunk_tokens, self.model.count_tokens)
+
+    def with_overrides(self, **overrides) -> "QuizGenerator":
+        """
+        Returns a generator using `overrides` on top of this generator's config, sharing its model
+        client, text splitter, parser and loaders. Settings that need a rebuild are rejected.
+        """
+        overrides = {key: value for key, value in overrides.items() if value is not None}
+        if not overrides:
+            return self
+
+        unsupported = set(overrides) - OVERRIDABLE_SETTINGS
+        if unsupported:
+            raise ValueError(f"Cannot override {', '.join(sorted(unsupported))} per request. Try {', '.join(sorted(OVERRIDABLE_SETTINGS))}")
+
+        generator = copy.copy(self)
+        generator.config = self.config.model_copy(update=overrides)
+        generator.scheduler = ChunkScheduler(generator.config.max_concurrency)
+        return generator
 
+    def _get_loader(self, file_type: str):
         loader = self.document_loaders.get(file_type)
         if loader is None:
             raise NotImplementedError(f"{file_type} is not supported yet.")
-        
+        return loader
+
+    async def load_document(self, file_path: str, file_type: Literal["pdf"] = "pdf") -> List[Document]:
+        logging.info(f"Loading document from path: {file_path}")
+
+        loader = self._get_loader(file_type)
         documents = await loader.aload(file_path)
         logging.info(f"Loaded {len(documents)} document chunks")
         return documents
 
-    async def generate_from_documents(self, documents: List[Document]) -> List[Quiz]:
+    async def iter_document(self, file_path: str, file_type: Literal["pdf"] = "pdf") -> AsyncIterator[Document]:
+        """Yields the document's chunks page by page, so generation can start before loading finishes."""
+        logging.info(f"Streaming document from path: {file_path}")
+
+        loader = self._get_loader(file_type)
+        async for chunk in loader.aiter_chunks(file_path):
+            yield chunk
+
+    def _quiz_count(self, document: Document) -> int:
+        return document.metadata.get("quiz_count", self.config.questions_per_chunk)
+
+    async def _plan_chunks(self, documents: AsyncIterator[Document]) -> AsyncIterator[Document]:
+        """Sets how many questions each chunk gets as `quiz_count`, zero for chunks that aren't worth an LLM call."""
+        target = self.config.target_quiz_count
+        if target is not None:
+            # Spreading a total needs every chunk's score, so planning waits for the whole document
+            for document in self.planner.plan([document async for document in documents], target):
+                yield document
+            return
+
+        async for document in documents:
+            if self.config.skip_boilerplate_chunks and self.planner.score(document) == 0:
+                logging.info(f"Skipping chunk {document.metadata['chunk_id']}, it has nothing worth quizzing")
+                document.metadata["quiz_count"] = 0
+            yield document
+
+    async def _parse_responses(self, message: str, packed: bool = False) -> AsyncIterator[List[QuizContent]]:
+        """
+        Runs one generation prompt and yields its quizzes as they are parsed: all at once with structured
+        output, otherwise each as soon as its JSON object has streamed in.
+        """
+        if self.structured_output:
+            # The provider returns schema-validated quizzes, there is no text to extract them from
+            quiz_list = await self.model.a_generate_structured(message, PackedQuizList if packed else QuizList)
+            if quiz_list is not None:
+                yield quiz_list.quizzes
+            return
+
+        stream_parser = self.parser.stream(PackedQuiz if packed else Quiz)
+        async for piece in self.model.a_stream(message):
+            yield stream_parser.feed(piece)
+
+    def _accept(self, quizzes: List[QuizContent], source: Optional[QuizSource]) -> List[Quiz]:
+        # Structurally broken quizzes are fixed or dropped here, before anything pays to score them
+        accepted, _ = self.validator.filter([Quiz(**quiz.model_dump(include=set(QuizContent.model_fields))) for quiz in quizzes])
+        for quiz in accepted:
+            quiz.source = source
+        return accepted
+
+    async def _generate_quizzes(
+        self,
+        message: str,
+        source: Optional[QuizSource] = None,
+        on_quiz: Optional[Callable[[Quiz], None]] = None,
+    ) -> List[Quiz]:
+        """Runs one generation prompt and returns its valid quizzes, reporting each to `on_quiz` as it arrives."""
+        quizzes = []
+        async for parsed in self._parse_responses(message):
+            for quiz in self._accept(parsed, source):
+                quizzes.append(quiz)
+                if on_quiz is not None:
+                    on_quiz(quiz)
+        return quizzes
+
+    async def _generate_packed(
+        self,
+        documents: List[Document],
+        on_quiz: Optional[Callable[[Quiz], None]] = None,
+    ) -> List[List[Quiz]]:
+        """
+        Generates quizzes for several chunks in one request under the shared system prompt, and maps
+        them back to their chunks through the document number the model writes into each quiz.
+        """
+        quizzes: List[List[Quiz]] = [[] for _ in documents]
+        # Only chunks with questions planned are sent, numbered by their position in `documents`
+        numbered = [(number, document) for number, document in enumerate(documents, 1) if self._quiz_count(document) > 0]
+        if not numbered:
+            return quizzes
+
+        message = self.packed_template.format(documents="\n\n".join(
+            f"Document {number} ({self._quiz_count(document)} questions): {document.page_content}" for number, document in numbered
+        ))
+        sources = [_chunk_source(document) for document in documents]
+
+        async for parsed in self._parse_responses(message, packed=True):
+            for packed_quiz in parsed:
+                if not 1 <= packed_quiz.document <= len(documents):
+                    logging.error(f"Dropping quiz for document {packed_quiz.document}, the request had {len(documents)}")
+                    continue
+                for quiz in self._accept([packed_quiz], sources[packed_quiz.document - 1]):
+                    quizzes[packed_quiz.document - 1].append(quiz)
+                    if on_quiz is not None:
+                        on_quiz(quiz)
+        return quizzes
+
+    async def stream_from_documents(
+        self,
+        documents: Documents,
+        on_quiz: Optional[Callable[[Quiz], None]] = None,
+    ) -> AsyncIterator[ChunkResult[Document, List[Quiz]]]:
+        """
+        This function generates quizzes chunk by chunk, yielding each chunk's quizzes as soon as its LLM call completes.
+        At most `config.max_concurrency` requests are in flight at any time.
+        Args:
+            documents (Documents): A list or an async stream of Document objects containing the text to generate quizzes from.
+            on_quiz (Callable[[Quiz], None], optional): Called with every quiz as soon as its JSON object has streamed in.
+
+        Yields:
+            ChunkResult: The chunk index, its quizzes (or the error raised) and the latency of the call.
+        """
+
+        async def generate_chunk(document: Document) -> List[Quiz]:
+            if self._quiz_count(document) == 0:
+                return []
+            message = self.prompt_template.format(document=document.page_content, number=self._quiz_count(document))
+            return await self._generate_quizzes(message, _chunk_source(document), on_quiz)
+
+        chunks = self._plan_chunks(_number_chunks(documents))
+        chunks_per_request = self.config.chunks_per_request
+        if chunks_per_request <= 1:
+            async for chunk in self.scheduler.run(chunks, generate_chunk):
+                if chunk.ok:
+                    logging.info(f"Chunk {chunk.index} generated {len(chunk.result)} quizzes in {chunk.latency:.2f}s")
+                yield chunk
+            return
+
+        # Several chunks share each request, their results are still reported chunk by chunk
+        groups = _group_chunks(chunks, chunks_per_request)
+        async for group in self.scheduler.run(groups, lambda group: self._generate_packed(group, on_quiz)):
+            if group.ok:
+                logging.info(f"Chunks {group.item[0].metadata['chunk_id']}-{group.item[-1].metadata['chunk_id']} generated {sum(map(len, group.result))} quizzes in {group.latency:.2f}s")
+            for offset, document in enumerate(group.item):
+                yield ChunkResult(
+                    index=group.index * chunks_per_request + offset,
+                    item=document,
+                    result=group.result[offset] if group.ok else None,
+                    error=group.error,
+                    latency=group.latency,
+                )
+
+    async def generate_from_documents(
+        self,
+        documents: Documents,
+        progress: Optional[ProgressCallback] = None,
+        correct: bool = False,
+        on_quiz: Optional[Callable[[Quiz], None]] = None,
+    ) -> List[Quiz]:
         """
         This function generates quizzes from full documents by using a Large Language Model (LLM) to generate quiz questions.
         Args:
-            documents (List[Document]): A list of Document objects containing the text to generate quizzes from.
+            documents (Documents): A list or an async stream of Document objects containing the text to generate quizzes from.
+            progress (ProgressCallback, optional): Called after every chunk with the chunks done, the chunk total and the quizzes so far.
+            correct (bool, optional): Score each chunk's quizzes against it as soon as the chunk completes, regenerating rejected ones.
+            on_quiz (Callable[[Quiz], None], optional): Called with every generated quiz as soon as its JSON object has streamed in.
 
         Returns:
             List[Quiz]: A list of Quiz objects containing the generated quizzes.
@@ -52,58 +343,171 @@ class QuizGenerator:
 
         logging.info("Generating quizzes from documents")
 
-        # Create a list of messages to send to the LLM model, where each message is a formatted prompt template
-        system_prompt = self.parser.format(template_system_prompt)
-        self.prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", template_user_document)
-        ])
-
-        messages = [self.prompt_template.format(document=document, number=2) for document in documents]
-        # Send the messages to the LLM model in batches and retrieve the responses
+        # Chunks that fail are logged by the scheduler and skipped, so one bad call doesn't discard the rest
+        results: Dict[int, List[Quiz]] = {}
+        completed = []
+        # Chunks whose quizzes are being corrected, the only chunks kept after generation
+        corrections: Deque[Tuple[int, asyncio.Task]] = deque()
+        chunks_done = 0
         try:
-            responses = await self.model.a_batch(messages[:5])  # You can adjust the batch size as needed
-        except Exception as e:
-            logging.error(f"Error during LLM batch processing: {e}")
-            return []
+            async for chunk in self.stream_from_documents(documents, on_quiz):
+                chunks_done += 1
+                if chunk.ok:
+                    completed.extend(chunk.result)
+                    if correct and chunk.result:
+                        corrections.append((chunk.index, asyncio.create_task(self._correct_chunk(chunk.item, chunk.result))))
+                    else:
+                        results[chunk.index] = chunk.result
+                # When correction falls behind, generation waits for it rather than piling up chunks
+                while len(corrections) > self.config.max_concurrency:
+                    index, task = corrections.popleft()
+                    results[index] = await task
+                if progress is not None:
+                    progress(chunks_done, len(documents) if isinstance(documents, Sized) else chunks_done, completed)
 
-        # Iterate over the responses from the LLM model
-        quizzes = []
-        for response in responses:
-            quizzes.extend(self.parser.parse(response.content))
+            while corrections:
+                index, task = corrections.popleft()
+                results[index] = await task
+        finally:
+            for _, task in corrections:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in corrections), return_exceptions=True)
+
+        # Chunks finish in any order, the quizzes are returned (and deduplicated) in document order
+        quizzes = [quiz for index in sorted(results) for quiz in results[index]]
+
+        # Overlapping chunks often produce the same question twice. With `correct`, chunks are corrected before
+        # the rest of the document is seen, so duplicates are only dropped once correction is done
+        if self.deduplicator is not None:
+            embedding_model = await self.get_embedding_model() if self.config.dedup_embedding_threshold is not None else None
+            quizzes = await self.deduplicator.adeduplicate(quizzes, embedding_model)
 
         logging.info(f"Generated {len(quizzes)} quizzes")
         return quizzes
 
 
-    async def generate(self, pdf_path: str | Path) -> List[Quiz]:
+    async def regenerate_quiz(self, quiz: Quiz, documents: List[Document], feedback: str) -> Optional[Quiz]:
+        """
+        This function replaces one rejected quiz with a single new quiz generated from its source chunk.
+        Args:
+            quiz (Quiz): The rejected quiz.
+            documents (List[Document]): The quiz's source chunk, optionally with its neighbouring chunks.
+            feedback (str): Why the quiz was rejected.
+
+        Returns:
+            Optional[Quiz]: The replacement quiz, or None if the LLM response held no valid quiz.
+        """
+        message = self.regenerate_template.format(
+            document="\n\n".join(document.page_content for document in documents),
+            quiz=quiz.model_dump_json(exclude={"source"}),
+            feedback=feedback,
+        )
+        new_quizzes = await self._generate_quizzes(message, quiz.source)
+        return new_quizzes[0] if new_quizzes else None
+
+    async def regenerate_quizzes(self, rejected: List[Tuple[Quiz, List[Document], str]]) -> List[Optional[Quiz]]:
+        """
+        This function regenerates every rejected quiz of a correction pass in one concurrent round.
+        Args:
+            rejected (List[Tuple[Quiz, List[Document], str]]): The rejected quizzes with their source chunks and feedback.
+
+        Returns:
+            List[Optional[Quiz]]: One replacement per rejected quiz, in the same order (None where regeneration failed).
+        """
+        replacements: List[Optional[Quiz]] = [None] * len(rejected)
+
+        async for chunk in self.scheduler.run(rejected, lambda item: self.regenerate_quiz(*item)):
+            if chunk.ok:
+                replacements[chunk.index] = chunk.result
+
+        logging.info(f"Regenerated {sum(quiz is not None for quiz in replacements)} of {len(rejected)} quizzes")
+        return replacements
+
+    async def get_embedding_model(self) -> SentenceTransformerEmbedding:
+        # Built on first use, so the model is only loaded when a topic or embedding deduplication asks for it. It is
+        # kept in a dict shared with the copies made by `with_overrides`, so the model is loaded once per process.
+        # Loading takes seconds, so it runs in a thread, and the lock makes requests arriving meanwhile wait for it
+        async with self._shared_lock:
+            if "embedding_model" not in self._shared:
+                self._shared["embedding_model"] = await asyncio.to_thread(self._build_embedding_model)
+        return self._shared["embedding_model"]
+
+    def _build_embedding_model(self) -> SentenceTransformerEmbedding:
+        cache = EmbeddingCache(self.config.embedding_cache_path) if self.config.embedding_cache_path else None
+        return SentenceTransformerEmbedding(
+            self.config.embedding_model,
+            batch_size=self.config.embedding_batch_size,
+            cache=cache,
+        )
+
+    async def get_retriever(self) -> ChunkRetriever:
+        if "retriever" not in self._shared:
+            embedding_model = await self.get_embedding_model()
+            self._shared.setdefault("retriever", self._build_retriever(embedding_model))
+        return self._shared["retriever"]
+
+    def _build_retriever(self, embedding_model: SentenceTransformerEmbedding) -> ChunkRetriever:
+        return ChunkRetriever(embedding_model, self.config.index_path)
+
+    async def select_chunks(self, file_path: str | Path, topic: str) -> List[Document]:
+        """Returns the document's chunks most relevant to `topic`, in document order."""
+        documents = await self.load_document(str(file_path))
+        retriever = await self.get_retriever()
+        return await retriever.aretrieve(documents, topic, self.config.topic_top_k)
+
+    async def generate(self, pdf_path: str | Path, topic: Optional[str] = None) -> List[Quiz]:
         """
         This function generates quizzes from a PDF file by loading the PDF, splitting it into documents, and then generating quizzes from the documents.
 
         Args:
             pdf_path (str | Path): The path to the PDF file to generate quizzes from.
+            topic (str, optional): Only generate from the chunks most relevant to this topic.
 
         Returns:
             List[Quiz]: A list of Quiz objects containing the generated quizzes.
         """
 
-        # Load the PDF file and split it into documents
         logging.debug("Start generate: ")
-        documents = await self.load_document(pdf_path)
+        if topic:
+            return await self.generate_from_documents(await self.select_chunks(pdf_path, topic))
 
-        logging.debug("Start generate: ")
-        quizzes = await self.generate_from_documents(documents)
+        # Stream the PDF's chunks straight into generation, so LLM calls start while later pages are still parsed
+        quizzes = await self.generate_from_documents(self.iter_document(pdf_path))
 
         return quizzes
     
-    async def generate_and_correct(self, pdf_path: str | Path) -> List[Quiz]:
-        documents = await self.load_document(pdf_path)
-        quizzes = await self.generate_from_documents(documents)
-        
-        corrective = Corrective(self.model.model, self, documents)
-        corrected_quizzes = await corrective.correct_quizzes(quizzes)
-        
-        return corrected_quizzes
+    async def generate_and_correct(
+        self,
+        pdf_path: str | Path,
+        progress: Optional[ProgressCallback] = None,
+        topic: Optional[str] = None,
+        on_quiz: Optional[Callable[[Quiz], None]] = None,
+    ) -> List[Quiz]:
+        if topic:
+            return await self.generate_from_documents(await self.select_chunks(pdf_path, topic), progress, correct=True, on_quiz=on_quiz)
+
+        # Only the count and the last chunk read are kept, each chunk is released once its quizzes are corrected
+        chunks_read = 0
+        last_chunk: Optional[Document] = None
+        loaded = False
+
+        async def count_chunks() -> AsyncIterator[Document]:
+            nonlocal chunks_read, last_chunk, loaded
+            async for chunk in self.iter_document(pdf_path):
+                chunks_read += 1
+                last_chunk = chunk
+                yield chunk
+            loaded = True
+
+        def report(chunks_done: int, _: int, quizzes: List[Quiz]):
+            total = chunks_read if loaded else _estimate_chunk_total(chunks_read, last_chunk)
+            progress(chunks_done, max(total, chunks_done), quizzes)
+
+        return await self.generate_from_documents(count_chunks(), report if progress is not None else None, correct=True, on_quiz=on_quiz)
+
+    async def _correct_chunk(self, document: Document, quizzes: List[Quiz]) -> List[Quiz]:
+        corrective = Corrective(self.model, self, [document], max_concurrency=self.config.max_concurrency)
+        return await corrective.correct_quizzes(quizzes)
 
 
 def merge_quizzes(quizzes: List[Quiz]) -> str:
@@ -132,7 +536,6 @@ if __name__ == "__main__":
         logging.info("Final Merged Response:")
         print(final_response)
 
-    import asyncio
     asyncio.run(main())
 
     
@@ -0,0 +1,118 @@
+import logging
+import math
+import re
+from collections import Counter
+from typing import List
+
+from langchain_core.documents import Document
+
+DEFAULT_MIN_WORDS = 40
+DEFAULT_MAX_QUESTIONS_PER_CHUNK = 10
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Headings that open sections nobody wants to be quizzed on
+BOILERPLATE_HEADING = re.compile(
+    r"^\s*(\d+\.?\s*)?(references|bibliography|works cited|citations|table of contents|contents|index|acknowledge?ments)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# A table of contents line ends in a page number, a reference line looks like a citation
+TOC_LINE = re.compile(r"(\.{2,}|\s)\s*\d+\s*$")
+REFERENCE_LINE = re.compile(r"^\s*\[\d+\]|\(\d{4}[a-z]?\)|\bet al\.|\bdoi\b|arxiv|\bpp\.\s*\d|\bvol\.\s*\d", re.IGNORECASE)
+BOILERPLATE_LINE_SHARE = 0.4
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself him himself
+his how i if in into is it its itself just may me might more most must my myself no nor not now of off on once only or other
+our ours ourselves out over own same she should so some such than that the their theirs them themselves then there these they
+this those through to too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+
+class ChunkPlanner:
+    """
+    Scores chunks locally, without any LLM call, and spreads a quiz budget over them. Chunks that are
+    too short or look like references or a table of contents score zero and are skipped.
+    """
+
+    def __init__(self, min_words: int = DEFAULT_MIN_WORDS, max_questions_per_chunk: int = DEFAULT_MAX_QUESTIONS_PER_CHUNK):
+        self.min_words = min_words
+        self.max_questions_per_chunk = max_questions_per_chunk
+
+    def is_boilerplate(self, text: str) -> bool:
+        if BOILERPLATE_HEADING.search(text[:200]):
+            return True
+
+        lines = [line for line in text.splitlines() if line.strip()]
+        if not lines:
+            return True
+        toc_lines = sum(bool(TOC_LINE.search(line)) for line in lines)
+        reference_lines = sum(bool(REFERENCE_LINE.search(line)) for line in lines)
+        return max(toc_lines, reference_lines) / len(lines) >= BOILERPLATE_LINE_SHARE
+
+    def score(self, document: Document) -> float:
+        """
+        How much quiz material a chunk holds: its content words weighted by the entropy of its
+        vocabulary, so long but repetitive text doesn't outrank dense text.
+        """
+        text = document.page_content
+        words = [word.lower() for word in WORD_PATTERN.findall(text)]
+        if len(words) < self.min_words or self.is_boilerplate(text):
+            return 0.0
+
+        content_words = [word for word in words if len(word) > 2 and word not in STOPWORDS]
+        if not content_words:
+            return 0.0
+
+        counts = Counter(content_words)
+        total = len(content_words)
+        entropy = -sum(count / total * math.log2(count / total) for count in counts.values())
+        diversity = entropy / math.log2(total) if total > 1 else 0.0
+        return total * diversity
+
+    def allocate(self, scores: List[float], target: int) -> List[int]:
+        """
+        Splits `target` questions over the chunks in proportion to their scores, by largest remainder,
+        giving no chunk more than `max_questions_per_chunk`. Zero-score chunks get nothing.
+        """
+        counts = [0] * len(scores)
+        remaining = target
+        open_chunks = [i for i, score in enumerate(scores) if score > 0]
+
+        # Questions capped off one chunk are spread again over the chunks that still have room
+        while remaining > 0 and open_chunks:
+            total = sum(scores[i] for i in open_chunks)
+            shares = {i: remaining * scores[i] / total for i in open_chunks}
+            given = {i: min(int(shares[i]), self.max_questions_per_chunk - counts[i]) for i in open_chunks}
+            leftover = remaining - sum(given.values())
+            for i in sorted(open_chunks, key=lambda i: shares[i] - int(shares[i]), reverse=True):
+                if leftover == 0:
+                    break
+                if counts[i] + given[i] < self.max_questions_per_chunk:
+                    given[i] += 1
+                    leftover -= 1
+
+            for i, count in given.items():
+                counts[i] += count
+            remaining -= sum(given.values())
+            open_chunks = [i for i in open_chunks if counts[i] < self.max_questions_per_chunk]
+            if not any(given.values()):
+                break
+
+        if remaining > 0:
+            logging.warning(f"Only {target - remaining} of {target} questions fit in the chunks worth quizzing")
+        return counts
+
+    def plan(self, documents: List[Document], target: int) -> List[Document]:
+        """
+        Sets each chunk's share of `target` questions as `quiz_count` in its metadata,
+        zero for the chunks not worth generating from.
+        """
+        counts = self.allocate([self.score(document) for document in documents], target)
+        for document, count in zip(documents, counts):
+            document.metadata["quiz_count"] = count
+
+        logging.info(f"Planned {target} questions over {sum(count > 0 for count in counts)} of {len(documents)} chunks")
+        return documents
@@ -6,43 +6,54 @@ Document: Below is the content from which you need to generate quizzes. Read the
 
 Instructions: Based on the content provided in the document, generate a set of multiple-choice questions (MCQs). Each question should have four options: A, B, C, and D. Ensure that each question is clear and unambiguous, and the correct answer is based on the information provided in the document.
 
-Generate exactly {number} questions. For each question, provide the correct answer and a brief reasoning explaining why it is correct.
+For each question, provide the correct answer and a brief reasoning explaining why it is correct.
 
 If more documents are provided, continue generating quizzes based on the new content.
 """
 
-# Instruction for Corrective Agent
-template_system_corrective = """
-Score the following quiz based on the given document content:
+# Instruction for scoring several quizzes in a single call
+template_batch_corrective = """
+Score each of the following quizzes based on the given document content:
 
 Document: {document}
 
-Quiz:
-{quiz_content}
+Quizzes:
+{quizzes}
 
-Please evaluate this quiz on the following criteria:
+Please evaluate every quiz on the following criteria:
 1. Accuracy: Is the information in the quiz correct according to the document?
 2. Relevance: Is the quiz testing important concepts from the document?
 3. Clarity: Is the question clear and unambiguous?
 4. Difficulty: Is the difficulty level appropriate?
 5. Options: Are the answer options distinct and plausible?
 
-Provide a score from 0 to 1 for each criterion, and then an overall score.
-Explain your scoring briefly.
+Score each criterion from 0 to 1 and give each quiz an overall score, the average of its criteria scores.
 
-Format your response as:
-Accuracy: [score]
-Relevance: [score]
-Clarity: [score]
-Difficulty: [score]
-Options: [score]
-Overall Score: [average of above scores]
-
-Explanation: [brief explanation]
+Format your response as a JSON list with one object per quiz, using the quiz's index:
+[
+    {{"index": 0, "score": [overall score], "feedback": "[brief explanation]"}}
+]
 """
 
 
-template_user_document = "Document: {document}"
+template_user_document = """Document: {document}
+
+Generate exactly {number} questions."""
+
+# Instruction for generating quizzes from several documents in a single request
+template_user_documents = """{documents}
+
+For each document above, generate exactly the number of questions given in its heading. Add a "document" field to every question with the number of the document it was written from."""
+
+# Instruction for replacing a single rejected quiz
+template_user_regenerate = """Document: {document}
+
+The following quiz generated from this document was rejected by a reviewer:
+{quiz}
+
+Reviewer feedback: {feedback}
+
+Write exactly one new quiz from the document that fixes the problems described in the feedback."""
 
 
 
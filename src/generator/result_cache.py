@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from src.models.cache import DEFAULT_CACHE_TTL, InMemoryLRUCache
+from src.parser import Quiz
+
+
+def _is_cancelling() -> bool:
+    """Whether the current task has been asked to cancel (only known from Python 3.11 on)."""
+    task = asyncio.current_task()
+    return bool(getattr(task, "cancelling", lambda: 0)())
+
+
+class QuizResultCache:
+    """
+    Caches the final quizzes of a whole document, keyed on the document's content hash and the
+    generation config. Concurrent requests for the same key share a single computation; if the
+    request running it is cancelled, one of the waiting requests runs it instead.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float | None = DEFAULT_CACHE_TTL):
+        self.cache = InMemoryLRUCache(max_entries=max_entries, ttl=ttl)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(content_hash: str, config: BaseModel, topic: Optional[str] = None) -> str:
+        config_json = config.model_dump_json(exclude={"api_key"})
+        return hashlib.sha256(f"{content_hash}:{config_json}:{topic or ''}".encode("utf-8")).hexdigest()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[List[Quiz]]]) -> List[Quiz]:
+        cached = self.cache.get(key)
+        if cached is not None:
+            logging.info(f"Serving cached quizzes for {key[:12]}")
+            return cached
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            logging.info(f"Waiting for in-flight generation of {key[:12]}")
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # The request computing the result was cancelled rather than this one, take its place
+                if in_flight.cancelled() and not _is_cancelling():
+                    logging.info(f"In-flight generation of {key[:12]} was cancelled, taking it over")
+                    return await self.get_or_compute(key, compute)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            quizzes = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved so it isn't reported when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            # An empty result usually means generation failed, so let the next request retry it
+            if quizzes:
+                self.cache.set(key, quizzes)
+            future.set_result(quizzes)
+            return quizzes
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.cache.stats(), "in_flight": len(self._in_flight)}
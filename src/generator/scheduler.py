@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Generic, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+async def _as_async_iterator(items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
+
+
+async def _next_item(source: AsyncIterator[T]) -> Tuple[bool, Optional[T]]:
+    try:
+        return True, await anext(source)
+    except StopAsyncIteration:
+        return False, None
+
+
+@dataclass
+class ChunkResult(Generic[T, R]):
+    """Outcome of running the worker on a single chunk."""
+    index: int
+    item: T
+    result: Optional[R] = None
+    error: Optional[BaseException] = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ChunkScheduler:
+    """
+    Runs an async worker over every item with at most `max_concurrency` calls in flight,
+    yielding each result as soon as it completes rather than waiting for the whole batch.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+
+    async def run(
+        self,
+        items: Iterable[T] | AsyncIterable[T],
+        worker: Callable[[T], Awaitable[R]],
+    ) -> AsyncIterator[ChunkResult[T, R]]:
+        # Items are pulled lazily so that only `max_concurrency` tasks ever exist at once. Pulling from
+        # an async source is itself a task, so finished chunks are yielded while the source is still producing.
+        source = aiter(items) if isinstance(items, AsyncIterable) else _as_async_iterator(items)
+        pending: set[asyncio.Task] = set()
+        fetch: Optional[asyncio.Task] = None
+        exhausted = False
+        index = 0
+
+        try:
+            while True:
+                if fetch is None and not exhausted and len(pending) < self.max_concurrency:
+                    fetch = asyncio.create_task(_next_item(source))
+
+                waiting = pending | {fetch} if fetch is not None else pending
+                if not waiting:
+                    break
+
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if fetch in done:
+                    has_item, item = fetch.result()
+                    fetch = None
+                    if has_item:
+                        pending.add(asyncio.create_task(self._run_one(index, item, worker)))
+                        index += 1
+                    else:
+                        exhausted = True
+
+                finished = [task for task in done if task in pending]
+                pending.difference_update(finished)
+                for task in sorted(finished, key=lambda t: t.result().index):
+                    yield task.result()
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+                await asyncio.gather(fetch, return_exceptions=True)
+            for task in pending:
+                task.cancel()
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+    async def _run_one(self, index: int, item: T, worker: Callable[[T], Awaitable[R]]) -> ChunkResult[T, R]:
+        start = time.perf_counter()
+        try:
+            result = await worker(item)
+        except Exception as e:
+            logging.error(f"Chunk {index} failed: {e}")
+            return ChunkResult(index=index, item=item, error=e, latency=time.perf_counter() - start)
+
+        return ChunkResult(index=index, item=item, result=result, latency=time.perf_counter() - start)
@@ -22,12 +22,12 @@ class WebSearchTool:
         pass
 
 class VectorDBTool:
-    def __init__(self, vector_store: VectorStore):
+    def __init__(self, vector_store: VectorStore, k: int = 4):
         self.vector_store = vector_store
+        self.k = k
 
     def search(self, query: str) -> List[str]:
-        # Implement vector store search here
-        pass
+        return [document.page_content for document in self.vector_store.similarity_search(query, k=self.k)]
 
 class SyntheticDataTool:
     def __init__(self, llm):
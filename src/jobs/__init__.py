@@ -0,0 +1,2 @@
+from .manager import JobManager
+from .store import Job, JobStore
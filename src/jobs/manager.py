@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import List, Optional
+
+from src.generator import QuizGenerator
+from src.parser import Quiz
+
+from .store import Job, JobStore
+
+DEFAULT_NUM_WORKERS = 2
+# Seconds without a heartbeat after which another process takes over a manager's unfinished jobs
+DEFAULT_LEASE = 30.0
+
+
+class JobManager:
+    """
+    Runs `QuizGenerator.generate_and_correct` for submitted uploads on a bounded pool of
+    background workers, recording progress and partial quizzes in the job store.
+
+    Several server processes can share one store. Each job is owned by the manager that submitted it,
+    and a manager that stops sending heartbeats for `lease` seconds has its unfinished jobs adopted by another.
+    """
+
+    def __init__(self, quiz_generator: QuizGenerator, store: JobStore, num_workers: int = DEFAULT_NUM_WORKERS, lease: float = DEFAULT_LEASE):
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+        self.quiz_generator = quiz_generator
+        self.store = store
+        self.num_workers = num_workers
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self.store.heartbeat(self.owner)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+        self.adopt_orphans()
+        self._heartbeat = asyncio.create_task(self._keep_alive())
+
+    async def stop(self):
+        tasks = self._workers + ([self._heartbeat] if self._heartbeat is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat = None
+        # Unfinished jobs can be adopted right away rather than after the lease runs out
+        self.store.remove_owner(self.owner)
+
+    def adopt_orphans(self):
+        """Queues the unfinished jobs of managers that are gone, while their upload still exists."""
+        for job_id in self.store.adopt_orphans(self.owner, self.lease):
+            job = self.store.get(job_id)
+            if os.path.exists(job.filepath):
+                logging.info(f"Resuming job {job.id}")
+                self._queue.put_nowait(job.id)
+            else:
+                self._fail(job, "Uploaded file is no longer available")
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            self.store.heartbeat(self.owner)
+            self.adopt_orphans()
+
+    async def join(self):
+        await self._queue.join()
+
+    def submit(self, filepath: str, overrides: Optional[dict] = None, topic: Optional[str] = None) -> Job:
+        job = Job(filepath=filepath, overrides=overrides or {}, topic=topic, owner=self.owner)
+        self.store.save(job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                # Another process may have adopted the job in the meantime, only one of them gets to run it
+                if self.store.claim(job_id, self.owner):
+                    await self._run(self.store.get(job_id))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        logging.info(f"Running job {job.id}")
+        # A resumed job starts over, drop what an earlier run recorded
+        job.chunks_done = job.chunks_total = 0
+        job.quizzes = []
+        self.store.save(job)
+
+        def progress(chunks_done: int, chunks_total: int, quizzes: List[Quiz]):
+            # Quizzes only grow during generation, so only the new ones are written
+            saved = len(job.quizzes)
+            job.chunks_done = chunks_done
+            job.chunks_total = chunks_total
+            job.quizzes = list(quizzes)
+            self.store.save_progress(job, saved)
+
+        try:
+            generator = self.quiz_generator.with_overrides(**job.overrides)
+            quizzes = await generator.generate_and_correct(job.filepath, progress=progress, topic=job.topic)
+        except Exception as e:
+            logging.error(f"Job {job.id} failed: {e}")
+            finished = self._fail(job, str(e))
+        else:
+            job.status = "done"
+            job.quizzes = quizzes
+            finished = self.store.save(job)
+            if finished:
+                logging.info(f"Job {job.id} finished with {len(quizzes)} quizzes")
+
+        # The upload still belongs to whichever process took the job over
+        if not finished:
+            logging.warning(f"Job {job.id} was taken over by another process, discarding this run")
+        elif os.path.exists(job.filepath):
+            os.remove(job.filepath)
+
+    def _fail(self, job: Job, error: str) -> bool:
+        job.status = "failed"
+        job.error = error
+        return self.store.save(job)
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from src.parser import Quiz
+
+JobStatus = Literal["queued", "running", "done", "failed"]
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = "queued"
+    # The job manager allowed to run and update the job
+    owner: Optional[str] = None
+    filepath: str
+    overrides: dict = {}
+    # Only generate from the chunks most relevant to this topic
+    topic: Optional[str] = None
+    chunks_done: int = 0
+    chunks_total: int = 0
+    quizzes: List[Quiz] = []
+    error: Optional[str] = None
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+
+class JobStore:
+    """
+    Keeps jobs in a local SQLite file so they survive a worker restart, and lets several server processes
+    share it. Each job is run by one owner at a time; owners that stop sending heartbeats lose their jobs.
+    Quizzes are stored one row each, so recording progress only writes the quizzes that are new.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_quizzes ("
+                "job_id TEXT NOT NULL, position INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (job_id, position))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)")
+
+    def save(self, job: Job) -> bool:
+        """
+        Writes the whole job, quizzes included. An existing job is only updated by its owner;
+        returns False when another owner holds it.
+        """
+        job.updated_at = time.time()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "INSERT INTO jobs (id, status, owner, data, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = excluded.status, owner = excluded.owner, data = excluded.data "
+                "WHERE jobs.owner IS excluded.owner",
+                (job.id, job.status, job.owner, job.model_dump_json(exclude={"quizzes"}), job.created_at),
+            ).rowcount
+            if updated:
+                self._conn.execute("DELETE FROM job_quizzes WHERE job_id = ?", (job.id,))
+                self._insert_quizzes(job, 0)
+        return bool(updated)
+
+    def save_progress(self, job: Job, new_quizzes_from: int) -> bool:
+        """Writes the job's counters and its quizzes from position `new_quizzes_from` on, if it still holds the job."""
+        job.updated_at = time.time()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE jobs SET data = ? WHERE id = ? AND owner IS ?",
+                (job.model_dump_json(exclude={"quizzes"}), job.id, job.owner),
+            ).rowcount
+            if updated:
+                self._insert_quizzes(job, new_quizzes_from)
+        return bool(updated)
+
+    def _insert_quizzes(self, job: Job, start: int):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO job_quizzes (job_id, position, data) VALUES (?, ?, ?)",
+            ((job.id, position, quiz.model_dump_json()) for position, quiz in enumerate(job.quizzes[start:], start)),
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            quizzes = self._conn.execute(
+                "SELECT data FROM job_quizzes WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        job = Job.model_validate_json(row[0])
+        # Jobs written before quizzes had their own table still carry them in `data`
+        job.quizzes = [Quiz.model_validate_json(quiz[0]) for quiz in quizzes] or job.quizzes
+        return job
+
+    def list_unfinished(self) -> List[Job]:
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at",
+                UNFINISHED_STATUSES,
+            ).fetchall()
+        return [self.get(row[0]) for row in rows]
+
+    def claim(self, job_id: str, owner: str) -> bool:
+        """Marks a queued job of `owner` as running. Returns False if the job was taken over or already ran."""
+        with self._lock, self._conn:
+            return bool(self._conn.execute(
+                "UPDATE jobs SET status = 'running', data = json_set(data, '$.status', 'running') "
+                "WHERE id = ? AND status = 'queued' AND owner IS ?",
+                (job_id, owner),
+            ).rowcount)
+
+    def heartbeat(self, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO owners (owner, heartbeat_at) VALUES (?, ?)", (owner, time.time()))
+
+    def remove_owner(self, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM owners WHERE owner = ?", (owner,))
+
+    def adopt_orphans(self, owner: str, stale_after: float) -> List[str]:
+        """
+        Requeues, under `owner`, the unfinished jobs whose owner has not sent a heartbeat for `stale_after`
+        seconds, and returns their ids in submission order. Done in one transaction, so every orphan is
+        adopted by a single owner.
+        """
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATUSES)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"UPDATE jobs SET status = 'queued', owner = ?, "
+                f"data = json_set(data, '$.status', 'queued', '$.owner', ?) "
+                f"WHERE status IN ({placeholders}) AND owner IS NOT ? AND (owner IS NULL OR owner NOT IN "
+                f"(SELECT owner FROM owners WHERE heartbeat_at >= ?)) RETURNING id, created_at",
+                (owner, owner, *UNFINISHED_STATUSES, owner, time.time() - stale_after),
+            ).fetchall()
+        return [job_id for job_id, _ in sorted(rows, key=lambda row: row[1])]
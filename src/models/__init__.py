@@ -1,11 +1,16 @@
 from .base import BaseLLM
 from .gemini import GeminiLLM
 from .groq import GroqLLM
+from .openai import GPTModel
+from .router import RouterLLM
 
 
 all_base_model = {
     "groq": GroqLLM,
-    "gemini": GeminiLLM
+    "gemini": GeminiLLM,
+    "openai": GPTModel,
+    # Wraps config.provider and config.fallback_providers
+    "router": RouterLLM,
 }
 
 class NotSupportedLLMException(Exception):
@@ -13,10 +18,10 @@ class NotSupportedLLMException(Exception):
 
 
 def get_llm_model(base_model: str) -> BaseLLM:
-    model = all_base_model[base_model]
+    model = all_base_model.get(base_model)
     if model is None:
-        raise NotSupportedLLMException("{} is not supported yet. Try {}").format(
-                base_model, " ,".join(list(all_base_model)
+        raise NotSupportedLLMException("{} is not supported yet. Try {}".format(
+                base_model, ", ".join(list(all_base_model))
         ))
     
     return model
\ No newline at end of file
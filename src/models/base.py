@@ -1,14 +1,427 @@
+import asyncio
+import functools
+import logging
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Optional, List
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, List, Type, TypeVar
 
+from langchain_core.messages import AIMessage
 from langchain_core.messages.base import BaseMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel as PydanticBaseModel, ValidationError
+
+from .cache import DEFAULT_CACHE_TTL, BaseResponseCache, get_response_cache, make_cache_key
+
+T = TypeVar("T")
+S = TypeVar("S", bound=PydanticBaseModel)
+
+RETRYABLE_STATUS_CODES = {429, 503}
+RETRYABLE_ERROR_MARKERS = ("429", "503", "resource has been exhausted", "rate limit", "quota", "overloaded", "unavailable")
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Returns True if the error means the provider is throttling us (429) or temporarily unavailable (503)."""
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int) and value in RETRYABLE_STATUS_CODES:
+            return True
+
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+
+    message = str(error).lower()
+    return any(marker in message for marker in RETRYABLE_ERROR_MARKERS)
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """Cheap token estimate (~4 characters per token) used to charge the tokens-per-minute budget."""
+    return len(str(prompt)) // 4 + 1
+
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_counter(encoding_name: str = DEFAULT_ENCODING) -> Callable[[str], int]:
+    """
+    Returns a function counting the tokens of a text with tiktoken when it's installed, otherwise
+    `estimate_tokens`. Providers don't ship their tokenizers, so this approximates them all.
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logging.info(f"tiktoken is unavailable ({e}), estimating tokens from characters")
+        return estimate_tokens
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _inline_refs(schema: Any, definitions: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            return _inline_refs(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+        return {key: _inline_refs(value, definitions) for key, value in schema.items() if key not in ("$defs", "title")}
+    if isinstance(schema, list):
+        return [_inline_refs(value, definitions) for value in schema]
+    return schema
+
+
+def to_tool_schema(schema: Type[PydanticBaseModel]) -> Dict[str, Any]:
+    """
+    Describes a pydantic model as an OpenAI-style function tool. References are inlined,
+    since some providers only accept a self-contained parameter schema.
+    """
+    json_schema = schema.model_json_schema()
+    return {
+        "type": "function",
+        "function": {
+            "name": schema.__name__,
+            "description": json_schema.get("description", ""),
+            "parameters": _inline_refs(json_schema, json_schema.get("$defs", {})),
+        },
+    }
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `rate_per_minute`, holding at most one minute of budget."""
+
+    def __init__(self, rate_per_minute: float):
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        self.capacity = float(rate_per_minute)
+        self.fill_rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Takes `amount` from the bucket, going into debt if needed, and returns how many
+        seconds the caller has to wait before its reservation is covered.
+        """
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.fill_rate
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets plus an adaptive concurrency limit.
+
+    Throttling errors (429/503) are retried with jittered exponential backoff and halve the
+    concurrency limit; a window of calls with a low error rate raises it again by one.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        window_size: int = 20,
+        error_rate_threshold: float = 0.1,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.error_rate_threshold = error_rate_threshold
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._successes_since_change = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Runs `call` inside the budgets, retrying it while the provider keeps throttling."""
+        attempt = 0
+        while True:
+            try:
+                async with self.limit(tokens):
+                    return await call()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Holds a concurrency slot and the budget for one request while the body runs."""
+        await self._acquire_slot()
+        try:
+            await self._wait_for_budget(tokens)
+            yield
+        except Exception as e:
+            if is_retryable_error(e):
+                self._record_throttle()
+            raise
+        else:
+            self._record_success()
+        finally:
+            self._release_slot()
+
+    def retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after `error`, or None if it shouldn't be retried."""
+        if not is_retryable_error(error) or attempt >= self.max_retries:
+            return None
+        delay = self._backoff(attempt)
+        logging.warning(f"Provider throttled the request ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    async def _wait_for_budget(self, tokens: int):
+        wait = self.request_bucket.reserve(1)
+        if self.token_bucket is not None and tokens:
+            wait = max(wait, self.token_bucket.reserve(tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _acquire_slot(self):
+        # Waiters are futures on the running loop, so one limiter can be shared by every caller in the process
+        while self.in_flight >= self.concurrency:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # A slot handed to a waiter cancelled before it resumed would be lost, pass it on
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_waiters()
+                raise
+        self.in_flight += 1
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        free = self.concurrency - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _record_throttle(self):
+        self._outcomes.append(False)
+        self._successes_since_change = 0
+        if self.error_rate > self.error_rate_threshold and self.concurrency > self.min_concurrency:
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            logging.info(f"Error rate {self.error_rate:.2f}, lowering concurrency to {self.concurrency}")
+
+    def _record_success(self):
+        self._outcomes.append(True)
+        self._successes_since_change += 1
+        if (
+            self.concurrency < self.max_concurrency
+            and self._successes_since_change >= self.concurrency
+            and self.error_rate <= self.error_rate_threshold
+        ):
+            self.concurrency += 1
+            self._successes_since_change = 0
+            logging.info(f"Error rate {self.error_rate:.2f}, raising concurrency to {self.concurrency}")
+            self._wake_waiters()
+
+
+# One limiter per provider model, shared by every BaseLLM in the process so they draw on a single quota
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(key: str, **limits) -> RateLimiter:
+    """Returns the process-wide limiter for `key`, creating it with `limits` on first use."""
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        limiter = RateLimiter(**limits)
+        _rate_limiters[key] = limiter
+    return limiter
 
 
 class BaseLLM(ABC):
+    rate_limiter: Optional[RateLimiter] = None
+    cache: Optional[BaseResponseCache] = None
+    # Providers that implement `bind_schema` can return validated objects instead of free text
+    supports_structured_output: bool = False
+    # Tokens the model accepts per request, prompt and output together; None when unknown
+    context_window: Optional[int] = None
+
     def __init__(self, model_name: Optional[str] = None, *args, **kwargs):
         self.model_name = model_name
         self.model = self.load_model(*args, **kwargs)
 
+    def count_tokens(self, text: str) -> int:
+        return get_token_counter()(text)
+
+    def _init_rate_limiter(self, provider: str, config: Any):
+        self.rate_limiter = get_rate_limiter(
+            f"{provider}:{self.model_name}",
+            requests_per_minute=getattr(config, "requests_per_minute", 60),
+            tokens_per_minute=getattr(config, "tokens_per_minute", None),
+            max_concurrency=getattr(config, "max_llm_concurrency", 8),
+        )
+
+    def _init_response_cache(self, config: Any):
+        if not getattr(config, "cache_enabled", True):
+            return
+        self.cache = get_response_cache(
+            path=getattr(config, "cache_path", None),
+            ttl=getattr(config, "cache_ttl", DEFAULT_CACHE_TTL),
+            max_entries=getattr(config, "cache_max_entries", 1024),
+        )
+
+    def _cache_key(self, prompt: Any, *args, **kwargs) -> str:
+        params = {
+            "temperature": getattr(self.model, "temperature", None),
+            "model_kwargs": getattr(getattr(self, "config", None), "model_kwargs", {}),
+            "call_args": args,
+            "call_kwargs": kwargs,
+        }
+        return make_cache_key(self.get_model_name(), prompt, params)
+
+    def _invoke(self, prompt: Any, *args, **kwargs) -> BaseMessage:
+        """Invokes the underlying chat model, answering from the response cache when possible."""
+        if self.cache is None:
+            return self.model.invoke(prompt, *args, **kwargs)
+
+        key = self._cache_key(prompt, *args, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return AIMessage(content=cached)
+
+        response = self.model.invoke(prompt, *args, **kwargs)
+        self.cache.set(key, response.content)
+        return response
+
+    async def _ainvoke(self, prompt: Any, *args, **kwargs) -> BaseMessage:
+        """
+        Invokes the underlying chat model, answering from the response cache when possible
+        and otherwise going through the shared rate limiter when one is set.
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(prompt, *args, **kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return AIMessage(content=cached)
+
+        if self.rate_limiter is None:
+            response = await self.model.ainvoke(prompt, *args, **kwargs)
+        else:
+            response = await self.rate_limiter.run(
+                lambda: self.model.ainvoke(prompt, *args, **kwargs),
+                tokens=estimate_tokens(prompt),
+            )
+
+        if key is not None:
+            self.cache.set(key, response.content)
+        return response
+
+    async def a_stream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[str]:
+        """
+        Streams the model's response text piece by piece. Cached responses are yielded whole; throttled
+        requests are retried as long as nothing has been yielded yet.
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(prompt, *args, **kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        pieces = []
+        attempt = 0
+        while True:
+            try:
+                if self.rate_limiter is None:
+                    async for piece in self.model.astream(prompt, *args, **kwargs):
+                        pieces.append(piece.content)
+                        yield piece.content
+                else:
+                    async with self.rate_limiter.limit(estimate_tokens(prompt)):
+                        async for piece in self.model.astream(prompt, *args, **kwargs):
+                            pieces.append(piece.content)
+                            yield piece.content
+                break
+            except Exception as e:
+                delay = self.rate_limiter.retry_delay(e, attempt) if self.rate_limiter is not None and not pieces else None
+                if delay is None:
+                    raise
+                attempt += 1
+            await asyncio.sleep(delay)
+
+        if key is not None:
+            self.cache.set(key, "".join(pieces))
+
+    def bind_schema(self, schema: Type[PydanticBaseModel]) -> Runnable:
+        """Returns the model bound to answer with a call to the `schema` tool."""
+        raise NotImplementedError(f"{type(self).__name__} has no native structured output")
+
+    async def a_generate_structured(self, prompt: Any, schema: Type[S]) -> Optional[S]:
+        """
+        Generates a response validated against `schema` with the provider's native structured output,
+        through the response cache and the rate limiter like `_ainvoke`.
+
+        Returns:
+            The validated object, or None if the model didn't answer with a valid `schema` call.
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(prompt, schema=schema.__name__)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return schema.model_validate_json(cached)
+
+        model = self.bind_schema(schema)
+        if self.rate_limiter is None:
+            response = await model.ainvoke(prompt)
+        else:
+            response = await self.rate_limiter.run(lambda: model.ainvoke(prompt), tokens=estimate_tokens(prompt))
+
+        tool_calls = [call for call in getattr(response, "tool_calls", []) if call["name"] == schema.__name__]
+        if not tool_calls:
+            logging.error(f"{self.get_model_name()} answered without calling {schema.__name__}")
+            return None
+
+        try:
+            result = schema.model_validate(tool_calls[0]["args"])
+        except ValidationError as e:
+            logging.error(f"Validation error: {e}")
+            return None
+
+        if key is not None:
+            self.cache.set(key, result.model_dump_json())
+        return result
+
     @abstractmethod
     def load_model(self, *args, **kwargs):
         """Loads a model, that will be responsible for scoring.
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 100_000
+
+
+def render_prompt(prompt: Any) -> str:
+    """Renders a prompt (string, PromptValue or list of messages) into the exact text sent to the model."""
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    if isinstance(prompt, (list, tuple)):
+        return "\n".join(f"{getattr(message, 'type', '')}: {getattr(message, 'content', message)}" for message in prompt)
+    return str(prompt)
+
+
+def make_cache_key(model_name: str, prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of a call: a SHA-256 over the model name, the rendered prompt and the sampling params."""
+    payload = json.dumps(
+        {"model": model_name, "prompt": render_prompt(prompt), "params": params or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseResponseCache(ABC):
+    """A key-value cache with hit and miss counters."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class InMemoryLRUCache(BaseResponseCache):
+    """Least-recently-used cache holding at most `max_entries` values for `ttl` seconds each."""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES, ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(BaseResponseCache):
+    """On-disk cache of string values, evicting the least recently accessed rows beyond `max_entries`."""
+
+    def __init__(self, path: str | Path, max_entries: int = DEFAULT_DISK_ENTRIES, ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl and created_at + self.ttl < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class TieredCache(BaseResponseCache):
+    """Looks up the in-memory tier first, then the disk tier, promoting disk hits into memory."""
+
+    def __init__(self, memory: InMemoryLRUCache, disk: SQLiteCache):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def _get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def __len__(self) -> int:
+        return len(self.disk)
+
+
+# One cache per location, shared by every BaseLLM in the process
+_response_caches: Dict[Optional[str], BaseResponseCache] = {}
+
+
+def get_response_cache(
+    path: Optional[str] = None,
+    ttl: Optional[float] = DEFAULT_CACHE_TTL,
+    max_entries: int = DEFAULT_MEMORY_ENTRIES,
+    max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+) -> BaseResponseCache:
+    """
+    Returns the process-wide response cache: memory only when `path` is None,
+    otherwise an LRU tier in front of a SQLite file at `path`.
+    """
+    cache = _response_caches.get(path)
+    if cache is None:
+        memory = InMemoryLRUCache(max_entries=max_entries, ttl=ttl)
+        cache = memory if path is None else TieredCache(memory, SQLiteCache(path, max_entries=max_disk_entries, ttl=ttl))
+        _response_caches[path] = cache
+    return cache
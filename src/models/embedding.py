@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .base import BaseEmbeddingModel
+
+default_embedding_model = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 32
+
+# SQLite allows at most 999 parameters per statement in older builds
+_MAX_QUERY_KEYS = 500
+
+
+class EmbeddingCache:
+    """On-disk store of float32 embeddings, keyed by a hash of the model name and the text."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _MAX_QUERY_KEYS):
+                batch = keys[start:start + _MAX_QUERY_KEYS]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def set_many(self, embeddings: Dict[str, np.ndarray]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in embeddings.items()),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class SentenceTransformerEmbedding(BaseEmbeddingModel):
+    """
+    Local sentence-transformers model, run on the CPU unless `device` says otherwise. Texts are embedded
+    in batches of similar length to keep padding low, and embeddings already in `cache` are not recomputed.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        device: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self.device = device
+        self.batch_size = batch_size
+        self.cache = cache
+        super().__init__(model_name or default_embedding_model)
+
+    def load_model(self, *args, **kwargs):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("Local embeddings need sentence-transformers. Try pip install sentence-transformers") from e
+        return SentenceTransformer(self.model_name, device=self.device)
+
+    def embed_text(self, text: str, *args, **kwargs) -> np.ndarray:
+        return self.embed_texts([text])[0]
+
+    async def a_embed_text(self, text: str, *args, **kwargs) -> np.ndarray:
+        return (await self.a_embed_texts([text]))[0]
+
+    def embed_texts(self, texts: List[str], *args, **kwargs) -> np.ndarray:
+        """Returns a float32 matrix with one unit-length row per text."""
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(set(keys)) if self.cache is not None else {}
+
+        # Each distinct text is encoded once, longest first, so every batch holds texts of similar length
+        missing = sorted({key: text for key, text in zip(keys, texts) if key not in found}.items(), key=lambda item: -len(item[1]))
+        computed = {}
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            vectors = self._encode([text for _, text in batch])
+            computed.update((key, vector) for (key, _), vector in zip(batch, vectors))
+
+        if computed and self.cache is not None:
+            self.cache.set_many(computed)
+        found.update(computed)
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(
+            self.model.encode(texts, batch_size=len(texts), normalize_embeddings=True, convert_to_numpy=True),
+            dtype=np.float32,
+        )
+
+    async def a_embed_texts(self, texts: List[str], *args, **kwargs) -> np.ndarray:
+        # Encoding is CPU bound, keep it off the event loop
+        return await asyncio.to_thread(self.embed_texts, texts)
+
+    def get_model_name(self, *args, **kwargs) -> str:
+        return self.model_name
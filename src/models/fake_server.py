@@ -0,0 +1,136 @@
+"""
+A stand-in for an OpenAI-compatible server, answering every prompt of the pipeline with deterministic
+quiz JSON after a configurable delay, and failing a configurable share of requests. Point GPTModel at
+it (openai_base_url="http://127.0.0.1:8001/v1") to load test the pipeline without network access:
+
+    python -m src.models.fake_server --port 8001 --latency 0.5 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORD_PATTERN = re.compile(r"[A-Za-z]{4,}")
+PACKED_DOCUMENT = re.compile(r"Document (\d+) \((\d+) questions\)")
+QUESTION_COUNT = re.compile(r"Generate exactly (\d+) questions")
+SCORED_QUIZ = re.compile(r'"index": (\d+)')
+STREAM_PIECE_SIZE = 40
+
+
+def _make_quiz(prompt: str, number: int, words: List[str]) -> Dict[str, Any]:
+    # Seeded by the prompt, so the same request always gets the same quiz
+    rng = random.Random(hashlib.sha256(f"{prompt}\0{number}".encode("utf-8")).digest())
+    topic = " ".join(rng.sample(words, min(len(words), 5))) if words else f"topic {number}"
+    options = [" ".join(rng.sample(words, min(len(words), 3))) if words else f"option {i}" for i in range(4)]
+    answer = rng.choice("ABCD")
+    return {
+        "question": f"Which statement about {topic} is supported by the document?",
+        "options": options,
+        "answer": answer,
+        "reasoning": f"Option {answer} restates the document's point about {topic}.",
+    }
+
+
+def respond(messages: List[Dict[str, str]]) -> str:
+    """The answer the pipeline expects for each of its prompts: scores, packed quizzes or quizzes."""
+    prompt = "\n".join(message["content"] for message in messages)
+    if "Score each of the following quizzes" in prompt:
+        scores = []
+        for index in SCORED_QUIZ.findall(prompt):
+            digest = hashlib.sha256(f"{prompt}\0{index}".encode("utf-8")).digest()
+            scores.append({"index": int(index), "score": round(0.5 + digest[0] / 510, 2), "feedback": "Checked against the document."})
+        return json.dumps(scores)
+
+    # Quizzes are made of words from the request's own document, so different chunks get different quizzes
+    words = WORD_PATTERN.findall(messages[-1]["content"])
+    packed = PACKED_DOCUMENT.findall(prompt)
+    if packed:
+        quizzes = [
+            {**_make_quiz(prompt, int(document) * 100 + i, words), "document": int(document)}
+            for document, count in packed
+            for i in range(int(count))
+        ]
+    elif "Write exactly one new quiz" in prompt:
+        quizzes = [_make_quiz(prompt, 0, words)]
+    else:
+        match = QUESTION_COUNT.search(prompt)
+        quizzes = [_make_quiz(prompt, i, words) for i in range(int(match.group(1)) if match else 2)]
+    return json.dumps(quizzes, indent=2)
+
+
+def create_app(latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503, seed: int = 0) -> FastAPI:
+    """
+    Builds the server. Each request waits `latency` plus up to `jitter` seconds, and a seeded
+    `error_rate` share of requests is answered with `error_status`.
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "fake-quiz-model", "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        delay = latency + rng.uniform(0, jitter)
+        failed = rng.random() < error_rate
+
+        await asyncio.sleep(delay)
+        if failed:
+            return JSONResponse(status_code=error_status, content={"error": {"message": "Injected failure", "code": error_status}})
+
+        content = respond(body["messages"])
+        model = body.get("model", "fake-quiz-model")
+
+        if not body.get("stream"):
+            return {
+                "id": f"chatcmpl-{app.state.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            }
+
+        async def events():
+            for start in range(0, len(content), STREAM_PIECE_SIZE):
+                chunk = {
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[start:start + STREAM_PIECE_SIZE]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server answering with quiz JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every request waits")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.latency, args.jitter, args.error_rate, args.error_status, args.seed),
+        host=args.host,
+        port=args.port,
+    )
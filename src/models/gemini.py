@@ -1,9 +1,12 @@
-from typing import Optional, List
+import asyncio
+from typing import Optional, List, Type
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages.base import BaseMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel as PydanticBaseModel
 
-from .base import BaseLLM
+from .base import BaseLLM, to_tool_schema
 
 
 default_gemini_model = "gemini-pro"
@@ -28,6 +31,23 @@ valid_gemini_models = ['gemini-pro',
                        'models/text-embedding-004',
                        'models/aqa']
 
+# Tokens each chat model accepts per request, used to size chunks
+gemini_context_windows = {'gemini-pro': 32760,
+                          'models/chat-bison-001': 4096,
+                          'models/text-bison-001': 8196,
+                          'models/gemini-1.0-pro-latest': 32760,
+                          'models/gemini-1.0-pro': 32760,
+                          'models/gemini-pro': 32760,
+                          'models/gemini-1.0-pro-001': 32760,
+                          'models/gemini-1.0-pro-vision-latest': 16384,
+                          'models/gemini-pro-vision': 16384,
+                          'models/gemini-1.5-pro-latest': 2097152,
+                          'models/gemini-1.5-pro-001': 2097152,
+                          'models/gemini-1.5-pro': 2097152,
+                          'models/gemini-1.5-flash-latest': 1048576,
+                          'models/gemini-1.5-flash-001': 1048576,
+                          'models/gemini-1.5-flash': 1048576}
+
 
 
 class GeminiLLM(BaseLLM):
@@ -37,13 +57,18 @@ class GeminiLLM(BaseLLM):
             model_name = model
             if model_name not in valid_gemini_models:
                 raise ValueError(
-                    f"Invalid model. Available GPT models: {', '.join(model for model in valid_gpt_models)}"
+                    f"Invalid model. Available Gemini models: {', '.join(model for model in valid_gemini_models)}"
                 )
         elif model is None:
             model_name = default_gemini_model
 
         super().__init__(model_name)
-        self.model = self.load_model()
+        self.context_window = gemini_context_windows.get(model_name)
+        # Only models that can be forced to call the quiz tool use it, the others may answer in text when
+        # merely offered it, so they are given the JSON format in the prompt instead
+        self.supports_structured_output = self.model._supports_tool_choice
+        self._init_rate_limiter("gemini", config)
+        self._init_response_cache(config)
 
 
     def load_model(self, *args, **kwargs):
@@ -55,16 +80,22 @@ class GeminiLLM(BaseLLM):
         )
 
     def generate(self, prompt: str, *args, **kwargs) -> str:
-        response = self.model.invoke(prompt, *args, **kwargs)
+        response = self._invoke(prompt, *args, **kwargs)
         return response.content
 
     async def a_generate(self, prompt: str, *args, **kwargs) -> str:
-        response = await self.model.ainvoke(prompt, *args, **kwargs)
+        response = await self._ainvoke(prompt, *args, **kwargs)
         return response.content
 
     async def a_batch(self, messages: List[str], *args, **kwargs) -> List[BaseMessage]:
-        responses = await self.model.abatch(messages, *args, **kwargs)
-        return responses
+        # Each message goes through the rate limiter on its own instead of one unthrottled abatch burst
+        responses = await asyncio.gather(*(self._ainvoke(message, *args, **kwargs) for message in messages))
+        return list(responses)
+
+    def bind_schema(self, schema: Type[PydanticBaseModel]) -> Runnable:
+        if not self.supports_structured_output:
+            raise NotImplementedError(f"{self.model_name} can't be forced to call a tool")
+        return self.model.bind_tools([to_tool_schema(schema)], tool_choice=schema.__name__)
 
     def get_model_name(self, *args, **kwargs) -> str:
         return self.model_name
\ No newline at end of file
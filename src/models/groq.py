@@ -1,17 +1,32 @@
-from typing import Optional, List
+import asyncio
+from typing import Optional, List, Type
 from langchain_core.messages.base import BaseMessage
+from langchain_core.runnables import Runnable
 from langchain_groq import ChatGroq
+from pydantic import BaseModel as PydanticBaseModel
 
-from .base import BaseLLM
+from .base import BaseLLM, to_tool_schema
 
 default_groq_model = "mixtral-8x7b-32768"
 
+# Tokens each model accepts per request, used to size chunks
+groq_context_windows = {"mixtral-8x7b-32768": 32768,
+                        "llama3-8b-8192": 8192,
+                        "llama3-70b-8192": 8192,
+                        "llama-3.1-8b-instant": 131072,
+                        "llama-3.1-70b-versatile": 131072,
+                        "gemma-7b-it": 8192,
+                        "gemma2-9b-it": 8192}
+
 class GroqLLM(BaseLLM):
-    def __init__(self, config, model_name: Optional[str] = None):
+    supports_structured_output = True
+
+    def __init__(self, config, model: Optional[str] = None):
         self.config = config
-        self.model_name = model_name or default_groq_model
-        self.model = self.load_model()
-        super().__init__(model_name)
+        super().__init__(model or default_groq_model)
+        self.context_window = groq_context_windows.get(self.model_name)
+        self._init_rate_limiter("groq", config)
+        self._init_response_cache(config)
 
     def load_model(self, *args, **kwargs):
         return ChatGroq(
@@ -22,16 +37,20 @@ class GroqLLM(BaseLLM):
         )
 
     def generate(self, prompt: str, *args, **kwargs) -> str:
-        response = self.model.invoke(prompt, *args, **kwargs)
+        response = self._invoke(prompt, *args, **kwargs)
         return response.content
 
     async def a_generate(self, prompt: str, *args, **kwargs) -> str:
-        response = await self.model.ainvoke(prompt, *args, **kwargs)
+        response = await self._ainvoke(prompt, *args, **kwargs)
         return response.content
 
     async def a_batch(self, prompts: List[str], *args, **kwargs) -> List[BaseMessage]:
-        responses = await self.model.abatch(prompts, *args, **kwargs)
-        return responses
+        # Each prompt goes through the rate limiter on its own instead of one unthrottled abatch burst
+        responses = await asyncio.gather(*(self._ainvoke(prompt, *args, **kwargs) for prompt in prompts))
+        return list(responses)
+
+    def bind_schema(self, schema: Type[PydanticBaseModel]) -> Runnable:
+        return self.model.bind_tools([to_tool_schema(schema)], tool_choice=schema.__name__)
 
     def get_model_name(self, *args, **kwargs) -> str:
         return self.model_name
@@ -1,5 +1,12 @@
+import asyncio
+import json
 import logging
 import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.base import BaseMessage
 
 from .base import BaseLLM
 
@@ -21,28 +28,177 @@ valid_gpt_models = [
     "gpt-3.5-turbo-0125",
 ]
 
+# Tokens each model accepts per request, used to size chunks
+gpt_context_windows = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-turbo-preview": 128000,
+    "gpt-4-0125-preview": 128000,
+    "gpt-4-1106-preview": 128000,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-0613": 8192,
+    "gpt-4-32k-0613": 32768,
+    "gpt-3.5-turbo-1106": 16385,
+    "gpt-3.5-turbo": 16385,
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-3.5-turbo-0125": 16385,
+}
+
 default_gpt_model = "gpt-4o"
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_TIMEOUT = 60.0
+
+MESSAGE_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def to_openai_messages(prompt: Any) -> List[Dict[str, str]]:
+    """Converts a string, a PromptValue or a list of messages into chat completion messages."""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    return [{"role": MESSAGE_ROLES.get(message.type, "user"), "content": message.content} for message in prompt]
+
+
+class OpenAIChatClient:
+    """
+    Minimal client for an OpenAI-compatible `/chat/completions` endpoint, exposing the `invoke`,
+    `ainvoke` and `astream` calls BaseLLM makes on a chat model. Connections are pooled and reused,
+    with one async pool per event loop.
+    """
 
-class GPTModel(BaseLLM):
     def __init__(
         self,
-        model: str | None = None,
-        _openai_api_key: str | None = None,
-        *args,
-        **kwargs,
+        model_name: str,
+        api_key: Optional[str],
+        base_url: str = DEFAULT_BASE_URL,
+        temperature: float = 0,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_connections: int = 8,
+        model_kwargs: Optional[Dict[str, Any]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
-        model_name = None
-        if isinstance(model, str):
-            model_name = model
-            if model_name not in valid_gpt_models:
-                raise ValueError(
-                    f"Invalid model. Available GPT models: {', '.join(model for model in valid_gpt_models)}"
-                )
-        elif model is None:
-            model_name = default_gpt_model
-
-        self._openai_api_key = _openai_api_key
-        # args and kwargs will be passed to the underlying model, in load_model function
-        self.args = args
-        self.kwargs = kwargs
-        super().__init__(model_name)
\ No newline at end of file
+        self.model_name = model_name
+        self.temperature = temperature
+        self.model_kwargs = model_kwargs or {}
+        self._client_kwargs = {
+            "base_url": base_url.rstrip("/"),
+            "headers": {"Authorization": f"Bearer {api_key}"} if api_key else {},
+            "timeout": timeout,
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        }
+        self._transport = transport
+        self._sync_client: Optional[httpx.Client] = None
+        self._async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+    def _payload(self, prompt: Any, stream: bool = False) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "messages": to_openai_messages(prompt),
+            "temperature": self.temperature,
+            "stream": stream,
+            **self.model_kwargs,
+        }
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            # Clients of loops that have since been closed can't be reused
+            for closed_loop in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed_loop]
+            client = httpx.AsyncClient(transport=self._transport, **self._client_kwargs)
+            self._async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _message(response: httpx.Response) -> AIMessage:
+        # Raises httpx.HTTPStatusError, whose response status lets the rate limiter spot 429 and 503
+        response.raise_for_status()
+        return AIMessage(content=response.json()["choices"][0]["message"]["content"] or "")
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> AIMessage:
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(**self._client_kwargs)
+        return self._message(self._sync_client.post("/chat/completions", json=self._payload(prompt)))
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> AIMessage:
+        return self._message(await self._client().post("/chat/completions", json=self._payload(prompt)))
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        async with self._client().stream("POST", "/chat/completions", json=self._payload(prompt, stream=True)) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield AIMessageChunk(content=content)
+
+    async def aclose(self):
+        for client in self._async_clients.values():
+            await client.aclose()
+        self._async_clients.clear()
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+class GPTModel(BaseLLM):
+    """
+    OpenAI chat models, or any server speaking the same API when `config.openai_base_url`
+    (or OPENAI_BASE_URL) points elsewhere. Local servers may serve any model name.
+    """
+
+    def __init__(self, config, model: Optional[str] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.config = config
+        self.base_url = getattr(config, "openai_base_url", None) or os.environ.get("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+        self.transport = transport
+
+        model_name = model or default_gpt_model
+        if self.base_url == DEFAULT_BASE_URL and model_name not in valid_gpt_models:
+            raise ValueError(
+                f"Invalid model. Available GPT models: {', '.join(model for model in valid_gpt_models)}"
+            )
+
+        super().__init__(model_name)
+        self.context_window = gpt_context_windows.get(model_name)
+        self._init_rate_limiter("openai", config)
+        self._init_response_cache(config)
+
+    def load_model(self, *args, **kwargs):
+        logging.info(f"Using {self.model_name} at {self.base_url}")
+        return OpenAIChatClient(
+            self.model_name,
+            api_key=self.config.api_key or os.environ.get("OPENAI_API_KEY"),
+            base_url=self.base_url,
+            temperature=0,
+            timeout=getattr(self.config, "openai_timeout", DEFAULT_TIMEOUT),
+            max_connections=getattr(self.config, "max_llm_concurrency", 8),
+            model_kwargs=self.config.model_kwargs,
+            transport=self.transport,
+        )
+
+    def generate(self, prompt: str, *args, **kwargs) -> str:
+        response = self._invoke(prompt, *args, **kwargs)
+        return response.content
+
+    async def a_generate(self, prompt: str, *args, **kwargs) -> str:
+        response = await self._ainvoke(prompt, *args, **kwargs)
+        return response.content
+
+    async def a_batch(self, prompts: List[str], *args, **kwargs) -> List[BaseMessage]:
+        # Each prompt goes through the rate limiter on its own, sharing the client's connection pool
+        responses = await asyncio.gather(*(self._ainvoke(prompt, *args, **kwargs) for prompt in prompts))
+        return list(responses)
+
+    def get_model_name(self, *args, **kwargs) -> str:
+        return self.model_name
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple, Type, TypeVar
+
+from langchain_core.messages.base import BaseMessage
+
+from .base import S, BaseLLM
+
+T = TypeVar("T")
+
+DEFAULT_WINDOW = 50
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_ERROR_RATE_THRESHOLD = 0.5
+DEFAULT_COOLDOWN = 30.0
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BackendStats:
+    """
+    Rolling latency and error rate of one backend. A backend whose error rate reaches the threshold
+    is taken out of rotation for `cooldown` seconds, then starts over with a clean window.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        error_rate_threshold: float = DEFAULT_ERROR_RATE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self.min_samples = min_samples
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.cooldown_until = 0.0
+
+    def record(self, latency: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        elif len(self.outcomes) >= self.min_samples and self.error_rate >= self.error_rate_threshold:
+            self.cooldown_until = time.monotonic() + self.cooldown
+            self.outcomes.clear()
+            self.latencies.clear()
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def p50(self) -> Optional[float]:
+        return _percentile(list(self.latencies), 0.5) if len(self.latencies) >= self.min_samples else None
+
+    @property
+    def p95(self) -> Optional[float]:
+        return _percentile(list(self.latencies), 0.95) if len(self.latencies) >= self.min_samples else None
+
+
+class RouterLLM(BaseLLM):
+    """
+    Spreads requests over several providers. Each request goes to the healthy backend with the lowest
+    median latency, falls back to the next one when it fails, and is hedged to the runner-up when it
+    takes longer than `hedge_after` seconds (by default the primary's p95 latency).
+    """
+
+    def __init__(self, config, model: Optional[str] = None):
+        # Imported here, the provider registry imports this module
+        from . import get_llm_model
+
+        self.config = config
+        backends = [get_llm_model(config.provider)(config=config, model=model)]
+        for provider in config.fallback_providers:
+            provider_config = config.model_copy(update={"api_key": config.provider_api_keys.get(provider)})
+            backends.append(get_llm_model(provider)(config=provider_config, model=config.provider_models.get(provider)))
+        self._init_backends(backends, hedge_after=config.hedge_after)
+
+    @classmethod
+    def from_backends(cls, backends: List[BaseLLM], hedge_after: Optional[float] = None, **stats) -> "RouterLLM":
+        router = cls.__new__(cls)
+        router._init_backends(backends, hedge_after=hedge_after, **stats)
+        return router
+
+    def _init_backends(self, backends: List[BaseLLM], hedge_after: Optional[float] = None, **stats):
+        if not backends:
+            raise ValueError("RouterLLM needs at least one backend")
+        self.backends = backends
+        self.stats = {id(backend): BackendStats(**stats) for backend in backends}
+        self.hedge_after = hedge_after
+        super().__init__(f"router({', '.join(backend.get_model_name() for backend in backends)})")
+        # Chunks have to fit whichever backend serves them
+        windows = [backend.context_window for backend in backends if backend.context_window is not None]
+        self.context_window = min(windows) if windows else None
+        self.supports_structured_output = any(backend.supports_structured_output for backend in backends)
+
+    def load_model(self, *args, **kwargs):
+        return None
+
+    def ranked_backends(self, backends: Optional[List[BaseLLM]] = None) -> List[BaseLLM]:
+        """Healthy backends first, fastest median first; backends without enough samples yet are tried early."""
+        backends = self.backends if backends is None else backends
+
+        def rank(position_backend):
+            position, backend = position_backend
+            stats = self.stats[id(backend)]
+            return (not stats.healthy, stats.p50 if stats.p50 is not None else 0.0, position)
+
+        return [backend for _, backend in sorted(enumerate(backends), key=rank)]
+
+    def _hedge_delay(self, backend: BaseLLM) -> Optional[float]:
+        return self.hedge_after if self.hedge_after is not None else self.stats[id(backend)].p95
+
+    async def _timed(self, backend: BaseLLM, call: Callable[[BaseLLM], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            result = await call(backend)
+        except asyncio.CancelledError:
+            # The loser of a hedge says nothing about its backend's health
+            raise
+        except Exception:
+            self.stats[id(backend)].record(time.perf_counter() - start, ok=False)
+            raise
+        self.stats[id(backend)].record(time.perf_counter() - start, ok=True)
+        return result
+
+    async def _route(
+        self,
+        call: Callable[[BaseLLM], Awaitable[T]],
+        backends: Optional[List[BaseLLM]] = None,
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> T:
+        """
+        Runs `call` on the best backend, hedging to the next one when it is slow and falling back when it fails.
+        Results that lose the race are passed to `discard`, so anything they hold open can be released.
+        """
+        backends = self.ranked_backends(backends)
+        pending: dict[asyncio.Task, BaseLLM] = {}
+        errors: List[Exception] = []
+        next_backend = 0
+        hedged = False
+
+        def launch():
+            nonlocal next_backend
+            backend = backends[next_backend]
+            next_backend += 1
+            pending[asyncio.create_task(self._timed(backend, call))] = backend
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if not hedged and next_backend < len(backends):
+                    timeout = self._hedge_delay(next(iter(pending.values())))
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    logging.info(f"No answer after {timeout:.2f}s, hedging to {backends[next_backend].get_model_name()}")
+                    launch()
+                    continue
+
+                results = []
+                # Answers that arrive together are taken in the backends' ranking order
+                for task in sorted(done, key=lambda task: backends.index(pending[task])):
+                    backend = pending.pop(task)
+                    try:
+                        results.append(task.result())
+                    except Exception as e:
+                        logging.warning(f"{backend.get_model_name()} failed ({e})")
+                        errors.append(e)
+                if results:
+                    # Several backends can answer in the same turn of the loop, only the first answer is used
+                    if discard is not None:
+                        for result in results[1:]:
+                            await discard(result)
+                    return results[0]
+
+                # Fall back once nothing is left in flight
+                if not pending and next_backend < len(backends):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                # A task can finish before its cancellation lands, its result has to be discarded too
+                outcomes = await asyncio.gather(*pending, return_exceptions=True)
+                if discard is not None:
+                    for outcome in outcomes:
+                        if not isinstance(outcome, BaseException):
+                            await discard(outcome)
+
+        raise errors[-1]
+
+    def generate(self, prompt: str, *args, **kwargs) -> str:
+        errors = []
+        for backend in self.ranked_backends():
+            try:
+                return backend.generate(prompt, *args, **kwargs)
+            except Exception as e:
+                logging.warning(f"{backend.get_model_name()} failed ({e})")
+                errors.append(e)
+        raise errors[-1]
+
+    async def a_generate(self, prompt: str, *args, **kwargs) -> str:
+        return await self._route(lambda backend: backend.a_generate(prompt, *args, **kwargs))
+
+    async def _ainvoke(self, prompt: Any, *args, **kwargs) -> BaseMessage:
+        return await self._route(lambda backend: backend._ainvoke(prompt, *args, **kwargs))
+
+    async def a_batch(self, prompts: List[str], *args, **kwargs) -> List[BaseMessage]:
+        # Every prompt is routed on its own, so a slow backend only holds up its own requests
+        return list(await asyncio.gather(*(self._ainvoke(prompt, *args, **kwargs) for prompt in prompts)))
+
+    async def _first_piece(self, backend: BaseLLM, prompt: Any, *args, **kwargs) -> Tuple[BaseLLM, AsyncIterator[str], Optional[str]]:
+        stream = backend.a_stream(prompt, *args, **kwargs)
+        try:
+            return backend, stream, await stream.__anext__()
+        except StopAsyncIteration:
+            return backend, stream, None
+
+    async def a_stream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[str]:
+        """
+        Streams from the best backend. Waiting for the first piece is routed like any other call, hedged
+        and falling back on failure; once a backend has answered, its stream is followed to the end.
+        """
+        backend, stream, first = await self._route(
+            lambda backend: self._first_piece(backend, prompt, *args, **kwargs),
+            discard=lambda result: result[1].aclose(),
+        )
+        try:
+            if first is None:
+                return
+            yield first
+            async for piece in stream:
+                yield piece
+        except Exception:
+            # Only the time to the first piece was recorded, a stream breaking later still counts against its backend
+            self.stats[id(backend)].record(0.0, ok=False)
+            raise
+        finally:
+            await stream.aclose()
+
+    async def a_generate_structured(self, prompt: Any, schema: Type[S]) -> Optional[S]:
+        backends = [backend for backend in self.backends if backend.supports_structured_output]
+        if not backends:
+            raise NotImplementedError(f"None of {self.get_model_name()} has native structured output")
+        return await self._route(lambda backend: backend.a_generate_structured(prompt, schema), backends)
+
+    def get_model_name(self, *args, **kwargs) -> str:
+        return self.model_name
@@ -1 +1,2 @@
-from .quiz import Quiz, QuizParse
\ No newline at end of file
+from .quiz import PackedQuiz, PackedQuizList, Quiz, QuizContent, QuizList, QuizParse, QuizSource, QuizStreamParser
+from .validation import QuizValidationResult, QuizValidator
@@ -1,48 +1,116 @@
 import logging
-from typing import List
+from typing import List, Optional, Type
 from pydantic import BaseModel as PydanticBaseModel, TypeAdapter, ValidationError
 
 from src.parser.format.quiz import JSON_FORMAT
 from src.parser.format.utils import _escape_curly_braces
 
 
-# Define the Pydantic Quiz class
-class Quiz(PydanticBaseModel):
+# Where a quiz was generated from, set by the generator rather than the LLM
+class QuizSource(PydanticBaseModel):
+    chunk_id: int
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+# The fields the LLM writes, also the schema given to providers with native structured output
+class QuizContent(PydanticBaseModel):
     question: str
     options: List[str]
     answer: str
     reasoning: str
 
+# Define the Pydantic Quiz class
+class Quiz(QuizContent):
+    source: Optional[QuizSource] = None
+
+class QuizList(PydanticBaseModel):
+    """The multiple-choice quizzes generated from the document."""
+    quizzes: List[QuizContent]
+
+# A quiz from a request holding several documents, `document` is the number the prompt gave its document
+class PackedQuiz(QuizContent):
+    document: int
+
+class PackedQuizList(PydanticBaseModel):
+    """The multiple-choice quizzes generated from the documents."""
+    quizzes: List[PackedQuiz]
+
+class QuizStreamParser:
+    """
+    Incremental parser for a JSON list of quizzes. Feed it the LLM output piece by piece and it
+    returns each Quiz as soon as its object closes. An element that fails validation is skipped
+    on its own instead of invalidating the whole list.
+    """
+
+    def __init__(self, model: Type[PydanticBaseModel] = Quiz):
+        self.quiz_ta = TypeAdapter(model)
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._buffer: List[str] = []
+
+    def feed(self, text: str) -> List[Quiz]:
+        quizzes = []
+        for char in text:
+            if self._depth == 0:
+                # Skip everything up to the list, then the separators between its objects
+                if char == "[" and not self._started:
+                    self._started = True
+                elif char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    quiz = self._validate("".join(self._buffer))
+                    if quiz is not None:
+                        quizzes.append(quiz)
+        return quizzes
+
+    def _validate(self, content: str) -> Optional[PydanticBaseModel]:
+        try:
+            return self.quiz_ta.validate_json(content)
+        except ValidationError as e:
+            logging.error(f"Skipping invalid quiz: {e}")
+            return None
+
+
 class QuizParse:
     FORMAT_STR: str = JSON_FORMAT
 
-    def __init__(self):
-        self.quiz_ta = TypeAdapter(List[Quiz])
-        
     def parse(self, content: str) -> List[Quiz]:
         """
         This function takes a string response from a LLM and 
         parses it into a list of Quiz objects.
         """
 
-        # Find the start and end indices of the quiz data in the response
-        # This is done by finding the first occurrence of '[' and the last occurrence of ']'
-        left = content.find("[")
-        right = content.rfind("]")
-
-        # Extract the quiz data from the response using the found indices
-        content = content[left: right + 1]
-
-        try:
-            # Attempt to validate the extracted quiz data as JSON
-            # This will raise a ValidationError if the data is invalid
-            list_quizzes = self.quiz_ta.validate_json(content)
-        except ValidationError as e:
-            # Log any validation errors that occur
-            logging.error(f"Validation error: {e}")
-            return []
+        # Quizzes are validated one object at a time, so a truncated or malformed element
+        # only loses that element rather than every quiz in the response
+        return QuizStreamParser().feed(content)
 
-        return list_quizzes 
+    def stream(self, model: Type[PydanticBaseModel] = Quiz) -> QuizStreamParser:
+        """Returns a parser to feed streamed LLM output into, validating each object as `model`."""
+        return QuizStreamParser(model)
 
-    def format(self, prompt_template: str) -> str:
+    def format(self, prompt_template: str, structured: bool = False) -> str:
+        # With structured output the provider enforces the schema, so the format block and its example are left out
+        if structured:
+            return prompt_template
         return prompt_template + "\n\n" + _escape_curly_braces(self.FORMAT_STR)
\ No newline at end of file
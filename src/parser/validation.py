@@ -0,0 +1,97 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from src.parser.quiz import Quiz
+
+OPTION_LETTERS = "ABCD"
+
+# "A", "(b)", "C.", "Option D", "Answer: a)"
+ANSWER_LETTER_PATTERN = re.compile(r"^(?:option|answer)?\s*:?\s*\(?([A-D])\)?[.):]?$", re.IGNORECASE)
+# "A. Paris", "b) Paris", "(C) Paris"
+OPTION_LABEL_PATTERN = re.compile(r"^\(?([A-D])[.):]\)?\s+", re.IGNORECASE)
+
+
+@dataclass
+class QuizValidationResult:
+    quiz: Quiz
+    accepted: bool = True
+    issues: List[str] = field(default_factory=list)
+    fixes: List[str] = field(default_factory=list)
+
+
+class QuizValidator:
+    """
+    Deterministic structural checks run on parsed quizzes before any LLM scoring.
+    Cosmetic problems are fixed in place; quizzes that can't be repaired are rejected.
+    """
+
+    def validate(self, quiz: Quiz) -> QuizValidationResult:
+        result = QuizValidationResult(quiz=quiz.model_copy())
+        quiz = result.quiz
+
+        quiz.question = quiz.question.strip()
+        quiz.reasoning = quiz.reasoning.strip()
+        options = [option.strip() for option in quiz.options]
+
+        # Options prefixed with their own letter ("A. Paris") are unlabelled when all four carry A-D in order
+        labels = [OPTION_LABEL_PATTERN.match(option) for option in options]
+        if len(options) == len(OPTION_LETTERS) and all(
+            match and match.group(1).upper() == letter for match, letter in zip(labels, OPTION_LETTERS)
+        ):
+            options = [option[match.end():].strip() for option, match in zip(options, labels)]
+            result.fixes.append("removed letter labels from options")
+        quiz.options = options
+
+        if not quiz.question:
+            result.issues.append("empty question")
+        if len(options) != len(OPTION_LETTERS):
+            result.issues.append(f"expected {len(OPTION_LETTERS)} options, got {len(options)}")
+        if any(not option for option in options):
+            result.issues.append("empty option")
+        normalized = [option.casefold() for option in options]
+        if len(set(normalized)) != len(normalized):
+            result.issues.append("duplicate options")
+        if not quiz.reasoning:
+            result.issues.append("empty reasoning")
+
+        answer = self._normalize_answer(quiz.answer, options)
+        if answer is None:
+            result.issues.append(f"answer {quiz.answer!r} is not A-D or one of the options")
+        elif answer != quiz.answer:
+            result.fixes.append(f"normalized answer {quiz.answer!r} to {answer!r}")
+            quiz.answer = answer
+
+        result.accepted = not result.issues
+        return result
+
+    def _normalize_answer(self, answer: str, options: List[str]) -> Optional[str]:
+        answer = answer.strip()
+        match = ANSWER_LETTER_PATTERN.match(answer)
+        if match:
+            letter = match.group(1).upper()
+            return letter if OPTION_LETTERS.index(letter) < len(options) else None
+
+        # The answer was given as the option text, possibly with its label ("C. Paris")
+        text = OPTION_LABEL_PATTERN.sub("", answer).casefold()
+        for letter, option in zip(OPTION_LETTERS, options):
+            if option.casefold() in (answer.casefold(), text):
+                return letter
+        return None
+
+    def filter(self, quizzes: List[Quiz]) -> Tuple[List[Quiz], List[QuizValidationResult]]:
+        """
+        Returns the quizzes that passed (with fixes applied) and the results of the rejected ones.
+        """
+        accepted, rejected = [], []
+        for quiz in quizzes:
+            result = self.validate(quiz)
+            if result.accepted:
+                if result.fixes:
+                    logging.debug(f"Fixed quiz {result.quiz.question!r}: {', '.join(result.fixes)}")
+                accepted.append(result.quiz)
+            else:
+                logging.info(f"Rejected quiz {result.quiz.question!r}: {', '.join(result.issues)}")
+                rejected.append(result)
+        return accepted, rejected
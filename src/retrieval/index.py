@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.models.base import BaseEmbeddingModel
+
+DEFAULT_INDEX_DIR = ".cache/index"
+DEFAULT_TOP_K = 8
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+
+class ChunkIndex:
+    """The chunks of one document with their unit-length embeddings, searched by cosine similarity."""
+
+    def __init__(self, documents: List[Document], embeddings: np.ndarray):
+        if len(documents) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(documents)} chunks")
+        self.documents = documents
+        self.embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+    def search(self, query_embedding: np.ndarray, k: int = DEFAULT_TOP_K) -> List[Tuple[Document, float]]:
+        """Returns the `k` chunks closest to the query, closest first."""
+        if not self.documents:
+            return []
+        scores = self.embeddings @ _normalize(np.asarray(query_embedding, dtype=np.float32))
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(self.documents[i], float(scores[i])) for i in top[np.argsort(-scores[top])]]
+
+
+class ChunkRetriever:
+    """
+    Finds the chunks of a document that are about a topic. Chunk embeddings are computed once per
+    document and kept on disk under `index_dir`, keyed by the embedding model and the chunks' text.
+    """
+
+    def __init__(self, embedding_model: BaseEmbeddingModel, index_dir: str | Path = DEFAULT_INDEX_DIR):
+        self.embedding_model = embedding_model
+        self.index_dir = Path(index_dir)
+
+    def document_key(self, documents: List[Document]) -> str:
+        digest = hashlib.sha256(self.embedding_model.get_model_name().encode("utf-8"))
+        for document in documents:
+            digest.update(hashlib.sha256(document.page_content.encode("utf-8")).digest())
+        return digest.hexdigest()
+
+    async def aindex(self, documents: List[Document]) -> ChunkIndex:
+        if not documents:
+            return ChunkIndex([], np.empty((0, 0), dtype=np.float32))
+
+        path = self.index_dir / f"{self.document_key(documents)}.npz"
+        if path.exists():
+            logging.info(f"Loading chunk embeddings from {path}")
+            with np.load(path) as stored:
+                return ChunkIndex(documents, stored["embeddings"])
+
+        logging.info(f"Embedding {len(documents)} chunks")
+        embeddings = np.asarray(
+            await self.embedding_model.a_embed_texts([document.page_content for document in documents]),
+            dtype=np.float32,
+        ).reshape(len(documents), -1)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file of its own first, so a crash never leaves a truncated index behind
+        # and concurrent uploads of the same document don't write into each other's file
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.savez(tmp_file, embeddings=embeddings)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return ChunkIndex(documents, embeddings)
+
+    async def aretrieve(self, documents: List[Document], query: str, k: int = DEFAULT_TOP_K) -> List[Document]:
+        """Returns the `k` chunks most relevant to `query`, in document order."""
+        index = await self.aindex(documents)
+        query_embedding = await self.embedding_model.a_embed_text(query)
+        hits = index.search(np.asarray(query_embedding, dtype=np.float32), k)
+        logging.info(f"Retrieved {len(hits)} of {len(documents)} chunks for {query!r}")
+        positions = {id(document): position for position, document in enumerate(documents)}
+        return sorted((document for document, _ in hits), key=lambda document: positions[id(document)])
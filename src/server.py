@@ -1,18 +1,89 @@
 import os
+import json
+import asyncio
+import time
+import hashlib
 import logging
+import tempfile
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile, HTTPException   
+from fastapi import Depends, FastAPI, File, Form, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Tuple
 from pydantic import BaseModel
 
 from src.generator import QuizGenerator, Quiz
+from src.generator.result_cache import QuizResultCache
 from src.config import QuizGeneratorConfig
+from src.jobs import JobManager, JobStore
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-app = FastAPI()
+# Configure upload folder
+UPLOAD_FOLDER = 'uploads'
+ALLOWED_EXTENSIONS = { 'pdf' }
+
+# Uploads are copied to disk in fixed-size chunks and rejected once they exceed the maximum size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 100 * 1024 * 1024))
+# Room left in a request body for the multipart boundaries and the other form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Background job workers and their persistent store
+JOBS_DATABASE = os.path.join(UPLOAD_FOLDER, 'jobs.sqlite')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+# Ensure the upload folder exists
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects request bodies larger than `max_size` with 413 before the form is parsed: at once when
+    Content-Length is too large, otherwise as soon as more than `max_size` bytes have been received.
+    """
+
+    def __init__(self, app, max_size: int):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            response = JSONResponse(status_code=413, content={"detail": f"Request body is larger than {self.max_size} bytes"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    raise HTTPException(status_code=413, detail=f"Request body is larger than {self.max_size} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the generator and its model client once, every request shares them
+    app.state.quiz_generator = QuizGenerator(QuizGeneratorConfig())
+    app.state.job_manager = JobManager(app.state.quiz_generator, JobStore(JOBS_DATABASE), num_workers=JOB_WORKERS)
+    await app.state.job_manager.start()
+    yield
+    await app.state.job_manager.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 origins = [
     "http://localhost.tiangolo.com",
     "https://localhost.tiangolo.com",
@@ -21,6 +92,8 @@ origins = [
     "http://localhost:3000",
 ]
 
+# Oversized uploads are refused while they stream in, before Starlette spools them to disk
+app.add_middleware(UploadSizeLimitMiddleware, max_size=MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -30,13 +103,8 @@ app.add_middleware(
 )
 
 
-
-# Configure upload folder
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = { 'pdf' }
-
-# Ensure the upload folder exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Final quizzes of recently processed documents, keyed by file content and config
+result_cache = QuizResultCache()
 
 # Initialize QuizGenerator
 class QuizResponse(BaseModel):
@@ -46,12 +114,68 @@ class QuizResponse(BaseModel):
 def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    chunks_done: int
+    chunks_total: int
+    quizzes: List[Quiz]
+    error: Optional[str] = None
+
+async def save_upload(file: UploadFile, max_size: int = MAX_UPLOAD_SIZE) -> Tuple[str, str]:
+    """
+    Streams the upload into a uniquely named file in the upload folder without holding it in memory.
+
+    Returns:
+        Tuple[str, str]: The path of the saved file and the SHA-256 of its content.
+    """
+    fd, filepath = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_FOLDER)
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=413, detail=f"File is larger than {max_size} bytes")
+                sha256.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        os.remove(filepath)
+        raise
+
+    return filepath, sha256.hexdigest()
+
+def format_sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+def get_quiz_generator(request: Request) -> QuizGenerator:
+    return request.app.state.quiz_generator
+
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.job_manager
+
+def job_response(job) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        status=job.status,
+        chunks_done=job.chunks_done,
+        chunks_total=job.chunks_total,
+        quizzes=job.quizzes,
+        error=job.error,
+    )
+
 @app.get("/")
 async def home():
     return "Hello world"
 
 @app.post("/upload", response_model=QuizResponse)
-async def upload_file(file: UploadFile | None = File(...)):
+async def upload_file(
+    file: UploadFile | None = File(...),
+    questions_per_chunk: int | None = Form(None, ge=1),
+    topic: str | None = Form(None),
+    quiz_generator: QuizGenerator = Depends(get_quiz_generator),
+):
     logging.debug("Start generate: ")
 
     if not file:
@@ -61,23 +185,17 @@ async def upload_file(file: UploadFile | None = File(...)):
 
     logging.debug("Start generate: ")
 
-    filename = file.filename
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    # Save the file under a unique name, hashing it on the way
+    filepath, content_hash = await save_upload(file)
 
     try:
-        # Save the file
-        with open(filepath, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-
-        # Generate quizzes from the uploaded PDF
-        # Load the PDF file and split it into documents
-        # For demo, I apply default config for QuizGenerator here
-        quiz_generator = QuizGenerator(QuizGeneratorConfig())
-        quizzes = await quiz_generator.generate_and_correct(filepath)
-
-        # Clean up: remove the uploaded file
-        os.remove(filepath)
+        # Generate quizzes from the uploaded PDF with the shared generator and this request's settings
+        generator = quiz_generator.with_overrides(questions_per_chunk=questions_per_chunk)
+        cache_key = QuizResultCache.make_key(content_hash, generator.config, topic)
+        quizzes = await result_cache.get_or_compute(
+            cache_key,
+            lambda: generator.generate_and_correct(filepath, topic=topic)
+        )
 
         return QuizResponse(
             message="Generate quizzes from full document.",
@@ -85,10 +203,94 @@ async def upload_file(file: UploadFile | None = File(...)):
         )
 
     except Exception as e:
-        # Clean up in case of error
+        raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        # Clean up: remove the uploaded file
         if os.path.exists(filepath):
             os.remove(filepath)
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/upload/stream")
+async def upload_file_stream(
+    file: UploadFile | None = File(...),
+    questions_per_chunk: int | None = Form(None, ge=1),
+    topic: str | None = Form(None),
+    quiz_generator: QuizGenerator = Depends(get_quiz_generator),
+):
+    """Streams each quiz as a server-sent `quiz` event as soon as the model has written it, then a `summary` event."""
+    if not file:
+        raise HTTPException(status_code=400, detail="No file sent")
+    if not allowed_file(file.filename):
+        raise HTTPException(status_code=400, detail="File type not allowed")
+
+    filepath, _ = await save_upload(file)
+    generator = quiz_generator.with_overrides(questions_per_chunk=questions_per_chunk)
+
+    async def generate(quizzes: asyncio.Queue, stats: dict):
+        try:
+            documents = await generator.select_chunks(filepath, topic) if topic else generator.iter_document(filepath)
+            async for chunk in generator.stream_from_documents(documents, on_quiz=quizzes.put_nowait):
+                stats["chunks"] += 1
+                if not chunk.ok:
+                    stats["failed_chunks"] += 1
+        finally:
+            quizzes.put_nowait(None)
+
+    async def events():
+        start = time.perf_counter()
+        num_quizzes = 0
+        stats = {"chunks": 0, "failed_chunks": 0}
+        quizzes: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(generate(quizzes, stats))
+        try:
+            # Each quiz is sent as soon as its JSON object has streamed in from the model
+            while (quiz := await quizzes.get()) is not None:
+                num_quizzes += 1
+                yield format_sse("quiz", quiz.model_dump_json())
+            await producer
+
+            yield format_sse("summary", json.dumps({
+                "quizzes": num_quizzes,
+                **stats,
+                "elapsed": round(time.perf_counter() - start, 3),
+            }))
+        except Exception as e:
+            logging.error(f"Streaming generation failed: {e}")
+            yield format_sse("error", json.dumps({"detail": str(e)}))
+        finally:
+            # Stop generating if the client went away
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(
+    file: UploadFile | None = File(...),
+    questions_per_chunk: int | None = Form(None, ge=1),
+    topic: str | None = Form(None),
+    job_manager: JobManager = Depends(get_job_manager),
+):
+    if not file:
+        raise HTTPException(status_code=400, detail="No file sent")
+    if not allowed_file(file.filename):
+        raise HTTPException(status_code=400, detail="File type not allowed")
+
+    # The upload is kept under its unique name until its job finishes
+    filepath, _ = await save_upload(file)
+
+    overrides = {"questions_per_chunk": questions_per_chunk} if questions_per_chunk else {}
+    job = job_manager.submit(filepath, overrides, topic)
+    return job_response(job)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
 
 
 if __name__ == "__main__":
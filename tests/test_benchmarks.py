@@ -0,0 +1,55 @@
+import fitz
+import pytest
+
+from benchmarks.mock_llm import MockLLM
+from benchmarks.pipeline import compare, run_case
+from benchmarks.synthetic_pdf import make_pdf
+from src.config.quiz_generation import QuizGeneratorConfig
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def test_synthetic_pdf_is_deterministic(tmp_path):
+    first = make_pdf(tmp_path / "a.pdf", 3, seed=7)
+    second = make_pdf(tmp_path / "b.pdf", 3, seed=7)
+
+    assert first.read_bytes() == second.read_bytes()
+    with fitz.open(str(first)) as document:
+        assert document.page_count == 3
+        assert "Section 2" in document[1].get_text()
+
+
+@pytest.mark.asyncio
+async def test_mock_llm_answers_the_same_prompt_the_same_way():
+    model = MockLLM()
+    prompt = "Document: Photosynthesis converts light energy into chemical energy.\n\nGenerate exactly 2 questions."
+
+    assert await model.a_generate(prompt) == await model.a_generate(prompt)
+    assert "".join([piece async for piece in model.a_stream(prompt)]) == await model.a_generate(prompt)
+    assert model.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_run_case_reports_every_metric(tmp_path):
+    pdf_path = make_pdf(tmp_path / "bench.pdf", 3)
+    config = QuizGeneratorConfig(api_key="test", pdf_workers=1, cache_enabled=False)
+    case = await run_case(pdf_path, config, latency=0.0)
+
+    assert case["pages"] == 3
+    assert case["quizzes"] == case["chunks"] * config.questions_per_chunk
+    # One generation call per chunk, then at least one scoring call per chunk
+    assert case["llm_calls_per_document"] >= 2 * case["chunks"]
+    assert case["time_to_first_quiz_seconds"] <= case["pipeline_seconds"]
+    assert case["quizzes_per_second"] > 0 and case["peak_rss_mb"] > 0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"cases": [{"pages": 10, "pipeline_seconds": 1.0, "quizzes_per_second": 100.0, "llm_calls_per_document": 20}]}
+    cases = [{"pages": 10, "pipeline_seconds": 1.1, "quizzes_per_second": 70.0, "llm_calls_per_document": 30}]
+
+    regressions = compare(cases, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert any("quizzes_per_second" in regression for regression in regressions)
+    assert any("llm_calls_per_document" in regression for regression in regressions)
+    assert compare([{**cases[0], "pages": 100}], baseline) == []
@@ -0,0 +1,55 @@
+import pytest
+from langchain_core.documents import Document
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import QuizGenerator
+from src.generator.planner import ChunkPlanner
+
+pytest_plugins = ('pytest_asyncio',)
+
+THEORY = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. Chlorophyll absorbs red and blue "
+    "wavelengths inside the thylakoid membranes, driving electron transport that pumps protons and synthesizes ATP. "
+    "The Calvin cycle then fixes carbon dioxide using rubisco, consuming ATP and NADPH produced by the light reactions. "
+    "Stomata regulate gas exchange, balancing carbon uptake against water loss through transpiration in leaves."
+)
+REPETITIVE = " ".join(["The cell is small and the cell is round."] * 12)
+REFERENCES = "\n".join(
+    f"[{i}] A. Author, B. Author et al. Some paper title. Journal of Things, vol. {i}, pp. 1-10 (2019)." for i in range(1, 15)
+)
+CONTENTS = "Table of Contents\n" + "\n".join(f"Chapter {i} Some chapter title .......... {i * 10}" for i in range(1, 15))
+
+
+def test_scores_dense_text_above_repetitive_text_and_skips_boilerplate():
+    planner = ChunkPlanner()
+    scores = [planner.score(Document(page_content=text)) for text in [THEORY, REPETITIVE, REFERENCES, CONTENTS, "Too short."]]
+
+    assert scores[0] > scores[1] > 0
+    assert scores[2:] == [0.0, 0.0, 0.0]
+
+
+def test_allocation_reaches_target_and_respects_cap():
+    planner = ChunkPlanner(max_questions_per_chunk=4)
+
+    assert planner.allocate([3.0, 1.0, 0.0], 8) == [4, 4, 0]
+    assert sum(planner.allocate([5.0, 3.0, 2.0, 0.0], 7)) == 7
+    assert planner.allocate([1.0, 0.0], 10) == [4, 0]
+
+
+@pytest.mark.asyncio
+async def test_generator_skips_unplanned_chunks(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", target_quiz_count=3))
+    prompts = []
+
+    async def respond(prompt):
+        prompts.append(prompt)
+        yield '[{"question": "What is photosynthesis?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}]'
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    documents = [Document(page_content=text) for text in [THEORY, REFERENCES, CONTENTS]]
+    chunks = [chunk async for chunk in quiz_generator.stream_from_documents(documents)]
+
+    assert len(prompts) == 1
+    assert "Generate exactly 3 questions." in prompts[0]
+    assert [len(chunk.result) for chunk in chunks] == [1, 0, 0]
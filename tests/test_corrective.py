@@ -0,0 +1,95 @@
+import json
+import pytest
+from langchain_core.documents import Document
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import QuizGenerator
+from src.generator.corrective import Corrective
+from src.parser import Quiz, QuizSource
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeScoringLLM:
+    def __init__(self, low_scores=()):
+        self.low_scores = set(low_scores)
+        self.prompts = []
+
+    async def a_generate(self, prompt, *args, **kwargs):
+        self.prompts.append(prompt)
+        quizzes = json.loads(prompt[prompt.index("Quizzes:\n") + 9: prompt.index("\n\nPlease evaluate")])
+        return json.dumps([
+            {"index": quiz["index"], "score": 0.2 if quiz["question"] in self.low_scores else 0.9, "feedback": "ok"}
+            for quiz in quizzes
+        ])
+
+
+def make_quizzes(count):
+    return [Quiz(question=f"Q{i}?", options=["A", "B", "C", "D"], answer="A", reasoning="R") for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_quizzes_are_scored_in_batches():
+    llm = FakeScoringLLM()
+    corrective = Corrective(llm, None, [Document(page_content="content")], batch_size=4)
+
+    scores = await corrective.score_quizzes(make_quizzes(10))
+
+    assert len(llm.prompts) == 3
+    assert all(score is not None and score.score == 0.9 for score in scores)
+
+
+@pytest.mark.asyncio
+async def test_low_scoring_quizzes_are_regenerated_in_one_round(mocker):
+    llm = FakeScoringLLM(low_scores={"Q1?", "Q3?"})
+    quiz_generator = mocker.Mock()
+    replacement = Quiz(question="New?", options=["A", "B", "C", "D"], answer="B", reasoning="R")
+    quiz_generator.regenerate_quizzes = mocker.AsyncMock(return_value=[replacement, None])
+    documents = [Document(page_content="chunk text", metadata={"chunk_id": 0})]
+    corrective = Corrective(llm, quiz_generator, documents, batch_size=4)
+    quizzes = make_quizzes(5)
+    for quiz in quizzes:
+        quiz.source = QuizSource(chunk_id=0)
+
+    corrected = await corrective.correct_quizzes(quizzes)
+
+    quiz_generator.regenerate_quizzes.assert_awaited_once()
+    rejected = quiz_generator.regenerate_quizzes.call_args.args[0]
+    assert [quiz.question for quiz, _, _ in rejected] == ["Q1?", "Q3?"]
+    assert all(source == documents for _, source, _ in rejected)
+    # Q3 could not be regenerated, so it is kept as it was
+    assert [quiz.question for quiz in corrected] == ["Q0?", "New?", "Q2?", "Q3?", "Q4?"]
+
+
+@pytest.mark.asyncio
+async def test_quizzes_are_scored_against_their_source_chunk():
+    llm = FakeScoringLLM()
+    documents = [Document(page_content=f"chunk {i} text", metadata={"chunk_id": i}) for i in range(3)]
+    corrective = Corrective(llm, None, documents)
+    quizzes = make_quizzes(4)
+    for quiz, chunk_id in zip(quizzes, [0, 2, 0, 2]):
+        quiz.source = QuizSource(chunk_id=chunk_id)
+
+    scores = await corrective.score_quizzes(quizzes)
+
+    assert all(score is not None for score in scores)
+    assert len(llm.prompts) == 2
+    assert all("chunk 1 text" not in prompt for prompt in llm.prompts)
+    assert sum("chunk 0 text" in prompt for prompt in llm.prompts) == 1
+
+
+@pytest.mark.asyncio
+async def test_quiz_is_kept_when_its_regeneration_fails(mocker):
+    llm = FakeScoringLLM(low_scores={"Q1?"})
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test"))
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=RuntimeError("provider down"))
+    documents = [Document(page_content="chunk text", metadata={"chunk_id": 0})]
+    corrective = Corrective(llm, quiz_generator, documents)
+    quizzes = make_quizzes(3)
+    for quiz in quizzes:
+        quiz.source = QuizSource(chunk_id=0)
+
+    corrected = await corrective.correct_quizzes(quizzes)
+
+    assert quiz_generator.model.a_stream.call_count == 1
+    assert [quiz.question for quiz in corrected] == ["Q0?", "Q1?", "Q2?"]
@@ -0,0 +1,95 @@
+import threading
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import QuizGenerator
+from src.generator.dedup import QuizDeduplicator
+from src.parser import Quiz
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def make_quiz(question, options=("Berlin", "Madrid", "Paris", "Rome")):
+    return Quiz(question=question, options=list(options), answer="C", reasoning="R")
+
+
+def test_near_duplicates_are_dropped_keeping_the_first():
+    quizzes = [
+        make_quiz("What is the capital city of France in Western Europe?"),
+        make_quiz("Which planet is known as the red planet?", ["Mars", "Venus", "Jupiter", "Saturn"]),
+        make_quiz("What is the capital city of France in Western Europe ?", ["Rome", "Paris", "Madrid", "Berlin"]),
+    ]
+
+    deduplicated = QuizDeduplicator().deduplicate(quizzes)
+
+    assert deduplicated == quizzes[:2]
+
+
+def test_distinct_quizzes_are_kept():
+    quizzes = [make_quiz(f"Question number {i} about topic {i * 7}?", [f"a{i}", f"b{i}", f"c{i}", f"d{i}"]) for i in range(50)]
+
+    assert QuizDeduplicator().deduplicate(quizzes) == quizzes
+
+
+def test_embedding_similarity_catches_paraphrases():
+    quizzes = [make_quiz("Capital of France?"), make_quiz("Which city is France's capital?")]
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.05]], dtype=np.float32)
+
+    assert len(QuizDeduplicator().deduplicate(quizzes)) == 2
+    assert QuizDeduplicator().deduplicate(quizzes, embeddings) == quizzes[:1]
+
+
+@pytest.mark.asyncio
+async def test_adeduplicate_embeds_with_the_embedding_model(mocker):
+    model = mocker.Mock()
+    model.a_embed_texts = mocker.AsyncMock(return_value=[[1.0, 0.0], [1.0, 0.0]])
+    quizzes = [make_quiz("Capital of France?"), make_quiz("Which city is France's capital?")]
+
+    deduplicated = await QuizDeduplicator(embedding_model=model).adeduplicate(quizzes)
+
+    assert deduplicated == quizzes[:1]
+    model.a_embed_texts.assert_awaited_once()
+
+
+def test_embedding_comparisons_stay_within_buckets():
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((300, 32)).astype(np.float32)
+    # Every tenth quiz is a slightly perturbed copy of the one before it
+    for index in range(1, 300, 10):
+        embeddings[index] = embeddings[index - 1] + 0.05 * rng.standard_normal(32)
+    quizzes = [make_quiz(f"Question number {i} about topic {i * 7}?", [f"a{i}", f"b{i}", f"c{i}", f"d{i}"]) for i in range(300)]
+
+    deduplicated = QuizDeduplicator().deduplicate(quizzes, embeddings)
+
+    assert len(deduplicated) == 270
+    assert all(quizzes[index] not in deduplicated for index in range(1, 300, 10))
+
+
+@pytest.mark.asyncio
+async def test_generator_uses_embedding_model_when_enabled(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", dedup_embedding_threshold=0.9))
+    model = mocker.Mock()
+    model.a_embed_texts = mocker.AsyncMock(return_value=[[1.0, 0.0], [1.0, 0.0]])
+    threads = []
+
+    def build_embedding_model():
+        threads.append(threading.current_thread())
+        return model
+
+    mocker.patch.object(quiz_generator, '_build_embedding_model', side_effect=build_embedding_model)
+
+    async def respond(prompt):
+        question = "Capital of France?" if "first" in prompt else "Which city is France's capital?"
+        yield '[{"question": "%s", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}]' % question
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    quizzes = await quiz_generator.generate_from_documents([Document(page_content="The first chunk."), Document(page_content="The second chunk.")])
+
+    assert len(quizzes) == 1
+    assert quiz_generator.deduplicator.embedding_threshold == 0.9
+    model.a_embed_texts.assert_awaited_once()
+    # The model is loaded in a thread, not on the event loop
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
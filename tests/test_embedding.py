@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.models.embedding import EmbeddingCache, SentenceTransformerEmbedding
+
+
+class FakeSentenceTransformer:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size, normalize_embeddings, convert_to_numpy):
+        self.batches.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float64)
+
+
+class FakeEmbedding(SentenceTransformerEmbedding):
+    def load_model(self, *args, **kwargs):
+        return FakeSentenceTransformer()
+
+
+def test_embeds_distinct_texts_in_length_sorted_batches():
+    embedding = FakeEmbedding("fake-model", batch_size=2)
+
+    matrix = embedding.embed_texts(["aaa", "a", "aaaa", "aa", "a"])
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (5, 2)
+    assert matrix[:, 0].tolist() == [3, 1, 4, 2, 1]
+    assert embedding.model.batches == [["aaaa", "aaa"], ["aa", "a"]]
+
+
+def test_cached_embeddings_are_not_recomputed(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite")
+    FakeEmbedding("fake-model", cache=cache).embed_texts(["first", "second"])
+
+    embedding = FakeEmbedding("fake-model", cache=EmbeddingCache(tmp_path / "embeddings.sqlite"))
+    matrix = embedding.embed_texts(["second", "third", "first"])
+    other_model = FakeEmbedding("other-model", cache=cache)
+    other_model.embed_texts(["first"])
+
+    assert embedding.model.batches == [["third"]]
+    assert matrix[:, 0].tolist() == [6, 5, 5]
+    assert other_model.model.batches == [["first"]]
+    assert len(cache) == 4
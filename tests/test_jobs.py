@@ -0,0 +1,137 @@
+import pytest
+
+from src.jobs import Job, JobManager, JobStore
+from src.parser import Quiz
+
+pytest_plugins = ('pytest_asyncio',)
+
+QUIZ = Quiz(question="Q1?", options=["A", "B", "C", "D"], answer="A", reasoning="R1")
+
+
+class FakeQuizGenerator:
+    def __init__(self):
+        self.overrides = []
+        self.topics = []
+
+    def with_overrides(self, **overrides):
+        self.overrides.append(overrides)
+        return self
+
+    async def generate_and_correct(self, pdf_path, progress=None, topic=None):
+        self.topics.append(topic)
+        if "broken" in str(pdf_path):
+            raise RuntimeError("cannot read PDF")
+        for done in (1, 2):
+            progress(done, 2, [QUIZ] * done)
+        return [QUIZ, QUIZ]
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF")
+    return str(path)
+
+
+def test_store_round_trip(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite")
+    job = Job(filepath="a.pdf", chunks_total=3, quizzes=[QUIZ])
+    store.save(job)
+
+    reopened = JobStore(tmp_path / "jobs.sqlite")
+    assert reopened.get(job.id) == job
+    assert [j.id for j in reopened.list_unfinished()] == [job.id]
+    assert reopened.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_manager_runs_jobs_and_records_progress(tmp_path, upload):
+    generator = FakeQuizGenerator()
+    manager = JobManager(generator, JobStore(tmp_path / "jobs.sqlite"), num_workers=2)
+    await manager.start()
+
+    job = manager.submit(upload, {"questions_per_chunk": 3}, topic="routing")
+    failing = manager.submit(str(tmp_path / "broken.pdf"))
+    await manager.join()
+    await manager.stop()
+
+    job = manager.get(job.id)
+    assert job.status == "done"
+    assert (job.chunks_done, job.chunks_total) == (2, 2)
+    assert len(job.quizzes) == 2
+    assert {"questions_per_chunk": 3} in generator.overrides
+    assert job.topic == "routing" and "routing" in generator.topics
+
+    failing = manager.get(failing.id)
+    assert failing.status == "failed"
+    assert "cannot read PDF" in failing.error
+
+
+@pytest.mark.asyncio
+async def test_manager_resumes_unfinished_jobs(tmp_path, upload):
+    store = JobStore(tmp_path / "jobs.sqlite")
+    interrupted = Job(filepath=upload, status="running", chunks_done=1)
+    lost = Job(filepath=str(tmp_path / "gone.pdf"))
+    store.save(interrupted)
+    store.save(lost)
+
+    manager = JobManager(FakeQuizGenerator(), store)
+    await manager.start()
+    await manager.join()
+    await manager.stop()
+
+    assert manager.get(interrupted.id).status == "done"
+    assert manager.get(lost.id).status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_manager_leaves_jobs_of_live_owners_alone(tmp_path, upload):
+    store = JobStore(tmp_path / "jobs.sqlite")
+    store.heartbeat("other-worker")
+    running = Job(filepath=upload, status="running", owner="other-worker")
+    abandoned = Job(filepath=upload, status="running", owner="crashed-worker")
+    store.save(running)
+    store.save(abandoned)
+
+    manager = JobManager(FakeQuizGenerator(), store)
+    await manager.start()
+    await manager.join()
+    await manager.stop()
+
+    assert manager.get(running.id).status == "running"
+    assert manager.get(abandoned.id).status == "done"
+    assert manager.get(abandoned.id).owner == manager.owner
+
+
+def test_store_lets_only_the_owner_claim_and_update(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite")
+    job = Job(filepath="a.pdf", owner="first")
+    store.save(job)
+
+    assert not store.claim(job.id, "second")
+    assert store.claim(job.id, "first")
+    assert not store.claim(job.id, "first")
+    assert store.get(job.id).status == "running"
+
+    assert store.adopt_orphans("second", stale_after=30) == [job.id]
+    job.quizzes = [QUIZ]
+    assert not store.save_progress(job, 0)
+    assert not store.save(job)
+    assert store.get(job.id).owner == "second"
+    assert store.get(job.id).quizzes == []
+
+
+def test_store_appends_progress_quizzes(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite")
+    job = Job(filepath="a.pdf", owner="worker")
+    store.save(job)
+
+    for done in (1, 2, 3):
+        saved = len(job.quizzes)
+        job.chunks_done = done
+        job.quizzes = job.quizzes + [QUIZ.model_copy(update={"question": f"Q{done}?"})]
+        assert store.save_progress(job, saved)
+
+    stored = store.get(job.id)
+    assert stored.chunks_done == 3
+    assert [quiz.question for quiz in stored.quizzes] == ["Q1?", "Q2?", "Q3?"]
@@ -0,0 +1,80 @@
+import json
+import httpx
+import pytest
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator.prompt import template_system_prompt, template_user_document
+from src.models import GPTModel, get_llm_model
+from src.models.base import RateLimiter
+from src.models.fake_server import create_app
+from src.parser.quiz import QuizParse
+
+pytest_plugins = ('pytest_asyncio',)
+
+DOCUMENT = "Photosynthesis converts light energy into chemical energy stored in glucose inside chloroplasts."
+
+
+def make_model(**server):
+    app = create_app(seed=1, **server)
+    config = QuizGeneratorConfig(api_key="test", openai_base_url="http://fake/v1", cache_enabled=False)
+    model = GPTModel(config, model="fake-quiz-model", transport=httpx.ASGITransport(app=app))
+    # A private limiter, so retries in one test don't slow down the others
+    model.rate_limiter = RateLimiter(requests_per_minute=6000, base_delay=0.01, max_retries=3)
+    return model, app
+
+
+def quiz_prompt(number=3):
+    template = ChatPromptTemplate.from_messages([
+        ("system", QuizParse().format(template_system_prompt)),
+        ("user", template_user_document),
+    ])
+    return template.format_prompt(document=DOCUMENT, number=number)
+
+
+def test_registered_as_openai_provider():
+    assert get_llm_model("openai") is GPTModel
+
+
+def test_rejects_unknown_model_on_the_openai_api():
+    with pytest.raises(ValueError):
+        GPTModel(QuizGeneratorConfig(api_key="test"), model="fake-quiz-model")
+
+
+@pytest.mark.asyncio
+async def test_generate_returns_quizzes_from_server():
+    model, app = make_model()
+    quizzes = QuizParse().parse(await model.a_generate(quiz_prompt(3)))
+
+    assert len(quizzes) == 3
+    assert all(quiz.answer in "ABCD" and len(quiz.options) == 4 for quiz in quizzes)
+    assert app.state.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_pieces_join_into_the_full_answer():
+    model, app = make_model()
+    pieces = [piece async for piece in model.a_stream(quiz_prompt(2))]
+
+    assert len(pieces) > 1
+    assert len(json.loads("".join(pieces))) == 2
+
+
+@pytest.mark.asyncio
+async def test_throttled_requests_are_retried():
+    model, app = make_model(error_rate=0.5, error_status=503)
+    for _ in range(4):
+        assert QuizParse().parse(await model.a_generate(quiz_prompt(1)))
+
+    assert app.state.requests > 4
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_raised():
+    model, app = make_model(error_rate=1.0, error_status=400)
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        await model.a_generate(quiz_prompt(1))
+
+    assert error.value.response.status_code == 400
+    assert app.state.requests == 1
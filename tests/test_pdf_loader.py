@@ -0,0 +1,63 @@
+import fitz
+import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.document_loaders.pdf import PDFLoader
+from src.document_loaders.splitter import TokenBudgetSplitter
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.fixture
+def synthetic_pdf(tmp_path):
+    path = tmp_path / "synthetic.pdf"
+    doc = fitz.open()
+    for number in range(20):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {number} content")
+    doc.save(str(path))
+    return str(path)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_workers", [1, 2])
+async def test_pages_are_extracted_in_order(synthetic_pdf, max_workers):
+    loader = PDFLoader(RecursiveCharacterTextSplitter(), max_workers=max_workers, pages_per_task=3)
+
+    pages = await loader.aload_pages(synthetic_pdf)
+
+    assert [page.metadata["page"] for page in pages] == list(range(20))
+    assert all(page.page_content.strip() == f"Page {i} content" for i, page in enumerate(pages))
+    assert pages[0].metadata["total_pages"] == 20
+
+
+@pytest.mark.asyncio
+async def test_aload_splits_pages_into_chunks(synthetic_pdf):
+    loader = PDFLoader(RecursiveCharacterTextSplitter(chunk_size=10, chunk_overlap=0), max_workers=1)
+
+    chunks = await loader.aload(synthetic_pdf)
+
+    assert len(chunks) > 20
+    assert chunks[-1].metadata["page"] == 19
+
+
+@pytest.mark.asyncio
+async def test_aiter_chunks_numbers_chunks_in_order(synthetic_pdf):
+    loader = PDFLoader(RecursiveCharacterTextSplitter(), max_workers=2, pages_per_task=4)
+
+    chunks = [chunk async for chunk in loader.aiter_chunks(synthetic_pdf)]
+
+    assert [chunk.metadata["chunk_id"] for chunk in chunks] == list(range(20))
+    assert [chunk.metadata["page"] for chunk in chunks] == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_token_packing_continues_across_page_ranges(synthetic_pdf):
+    splitter = TokenBudgetSplitter(14, lambda text: len(text.split()))
+    whole = await PDFLoader(splitter, max_workers=1, pages_per_task=20).aload(synthetic_pdf)
+    by_range = await PDFLoader(splitter, max_workers=2, pages_per_task=3).aload(synthetic_pdf)
+
+    # Each page holds 3 words, so a 14 word budget packs 4 pages per chunk whatever the range size
+    assert [chunk.page_content for chunk in by_range] == [chunk.page_content for chunk in whole]
+    assert [(chunk.metadata["page"], chunk.metadata["page_end"]) for chunk in by_range] == [(start, start + 3) for start in range(0, 20, 4)]
+    assert [chunk.metadata["chunk_id"] for chunk in by_range] == list(range(5))
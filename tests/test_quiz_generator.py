@@ -1,3 +1,4 @@
+import re
 import warnings
 import asyncio
 import pytest
@@ -6,6 +7,7 @@ from langchain_core.documents import Document
 
 from src.generator import QuizGenerator, Quiz, merge_quizzes
 from src.config.quiz_generation import QuizGeneratorConfig
+from src.parser import QuizList
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 pytest_plugins = ('pytest_asyncio',)
@@ -57,6 +59,244 @@ async def test_load_document(quiz_generator, mock_pdf_file):
 #     assert len(quizzes) > 0
 #     assert all(isinstance(quiz, Quiz) for quiz in quizzes)
 
+@pytest.mark.asyncio
+async def test_generate_from_documents_covers_every_chunk(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", max_concurrency=2))
+
+    async def respond(prompt):
+        topic = prompt.rsplit("This is ", 1)[1].split(".")[0]
+        response = '[{"question": "What is %s about?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}]' % topic
+        # Stream the response in small pieces, as the provider does
+        for start in range(0, len(response), 7):
+            yield response[start:start + 7]
+
+    mock_generate = mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    documents = [Document(page_content=f"This is {topic}.") for topic in ["biology", "chemistry", "physics", "history", "geography", "music", "painting", "poetry"]]
+    quizzes = await quiz_generator.generate_from_documents(documents)
+
+    assert mock_generate.call_count == 8
+    assert len(quizzes) == 8
+    assert sorted(quiz.source.chunk_id for quiz in quizzes) == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_generate_from_documents_keeps_document_order(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", max_concurrency=4))
+    topics = ["biology", "chemistry", "physics", "history"]
+
+    async def respond(prompt):
+        topic = prompt.rsplit("This is ", 1)[1].split(".")[0]
+        # Later chunks answer first
+        await asyncio.sleep(0.01 * (len(topics) - topics.index(topic)))
+        yield '[{"question": "What is %s about?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}]' % topic
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    quizzes = await quiz_generator.generate_from_documents([Document(page_content=f"This is {topic}.") for topic in topics])
+
+    assert [quiz.question for quiz in quizzes] == [f"What is {topic} about?" for topic in topics]
+
+
+@pytest.mark.asyncio
+async def test_prompt_depends_only_on_chunk_text(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", dedup_threshold=None))
+
+    async def respond(prompt):
+        yield '[{"question": "Test?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}]'
+
+    mock_generate = mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    # The same upload saved under two temporary paths must produce the same prompt, so the response cache hits
+    documents = [Document(page_content="Same text.", metadata={"source": path, "file_path": path}) for path in ["/tmp/a.pdf", "/tmp/b.pdf"]]
+    await quiz_generator.generate_from_documents(documents)
+
+    prompts = [call.args[0] for call in mock_generate.call_args_list]
+    assert prompts[0] == prompts[1]
+    assert "/tmp/a.pdf" not in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_generate_and_correct_reports_total_before_loading_finishes(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", max_concurrency=2))
+
+    async def iter_document(pdf_path):
+        for page in range(10):
+            yield Document(page_content=f"Page {page}.", metadata={"page": page, "total_pages": 10, "chunk_id": page})
+
+    async def respond(prompt):
+        yield '[{"question": "%s?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}]' % prompt[-40:]
+
+    mocker.patch.object(quiz_generator, 'iter_document', side_effect=iter_document)
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+    mocker.patch.object(quiz_generator.model, 'a_generate', return_value="[]")
+    reports = []
+
+    await quiz_generator.generate_and_correct("doc.pdf", progress=lambda done, total, quizzes: reports.append((done, total)))
+
+    assert reports == [(done, 10) for done in range(1, 11)]
+
+
+@pytest.mark.asyncio
+async def test_generate_and_correct_scores_each_chunk_as_it_completes(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", max_concurrency=1, dedup_threshold=None))
+    calls = []
+
+    async def iter_document(pdf_path):
+        for page in range(6):
+            yield Document(page_content=f"Page {page}.", metadata={"page": page, "total_pages": 6, "chunk_id": page})
+
+    async def respond(prompt):
+        page = prompt.rsplit("Page ", 1)[1][0]
+        calls.append(("generate", page))
+        await asyncio.sleep(0.01)
+        yield '[{"question": "About page %s?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}]' % page
+
+    async def score(prompt):
+        calls.append(("score", prompt))
+        return '[{"index": 0, "score": 0.9, "feedback": "ok"}]'
+
+    mocker.patch.object(quiz_generator, 'iter_document', side_effect=iter_document)
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+    mocker.patch.object(quiz_generator.model, 'a_generate', side_effect=score)
+
+    seen = []
+    quizzes = await quiz_generator.generate_and_correct("doc.pdf", on_quiz=seen.append)
+
+    assert [quiz.question for quiz in quizzes] == [f"About page {page}?" for page in range(6)]
+    assert sorted(quiz.question for quiz in seen) == [quiz.question for quiz in quizzes]
+    scores = [prompt for kind, prompt in calls if kind == "score"]
+    # Every chunk is scored on its own, and the first one long before the last chunk is generated
+    assert len(scores) == 6
+    assert all("Page 0." not in prompt for prompt in scores[1:])
+    assert calls.index(("generate", "5")) > calls.index(("score", scores[0]))
+
+
+@pytest.mark.asyncio
+async def test_regenerate_quizzes_returns_one_replacement_per_quiz(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test"))
+
+    async def respond(prompt):
+        yield '[{"question": "New?", "options": ["A", "B", "C", "D"], "answer": "B", "reasoning": "Because"}]'
+
+    mock_generate = mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+    rejected = Quiz(question="Old?", options=["A", "B", "C", "D"], answer="A", reasoning="R", source={"chunk_id": 3})
+    documents = [Document(page_content="Only this chunk.")]
+
+    replacements = await quiz_generator.regenerate_quizzes([(rejected, documents, "Too vague")] * 3)
+
+    assert mock_generate.call_count == 3
+    assert "Only this chunk." in mock_generate.call_args.args[0]
+    assert "Too vague" in mock_generate.call_args.args[0]
+    assert all(quiz.question == "New?" and quiz.source.chunk_id == 3 for quiz in replacements)
+
+
+@pytest.mark.asyncio
+async def test_generate_from_documents_drops_duplicates(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test"))
+
+    async def respond(prompt):
+        yield '[{"question": "Test?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}]'
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    quizzes = await quiz_generator.generate_from_documents([Document(page_content="Overlapping text.") for _ in range(3)])
+
+    assert len(quizzes) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_from_documents_reports_each_quiz_as_it_closes(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test"))
+    seen = []
+
+    async def respond(prompt):
+        yield '[{"question": "First?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}, '
+        # The first quiz is reported before the rest of the response arrives
+        assert [quiz.question for quiz in seen] == ["First?"]
+        yield '{"question": "Second?", "options": ["A", "B", "C", "D"], "answer": "B", "reasoning": "R"}]'
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    chunks = [chunk async for chunk in quiz_generator.stream_from_documents([Document(page_content="Text.")], on_quiz=seen.append)]
+
+    assert chunks[0].ok
+    assert [quiz.question for quiz in chunks[0].result] == ["First?", "Second?"]
+    assert seen == chunks[0].result
+
+
+@pytest.mark.asyncio
+async def test_structured_output_skips_format_block_and_text_parsing(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", model="models/gemini-1.5-pro", structured_output=True))
+    quiz_list = QuizList(quizzes=[{"question": "Test?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}])
+    mock_structured = mocker.patch.object(quiz_generator.model, 'a_generate_structured', return_value=quiz_list)
+
+    quizzes = await quiz_generator.generate_from_documents([Document(page_content="This is a test document.")])
+
+    assert "JSON format:" not in mock_structured.call_args.args[0]
+    assert mock_structured.call_args.args[1] is QuizList
+    assert [quiz.question for quiz in quizzes] == ["Test?"]
+    assert quizzes[0].source.chunk_id == 0
+
+
+@pytest.mark.asyncio
+async def test_structured_output_falls_back_to_the_prompt_format_without_forced_tool_calls(mocker):
+    # gemini-pro can only be offered the quiz tool, so it is asked for JSON in the prompt and answers in text
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", model="gemini-pro", structured_output=True))
+
+    async def respond(prompt):
+        yield '[{"question": "Test?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}]'
+
+    mock_stream = mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+    mock_structured = mocker.patch.object(quiz_generator.model, 'a_generate_structured')
+
+    quizzes = await quiz_generator.generate_from_documents([Document(page_content="This is a test document.")])
+
+    assert not quiz_generator.structured_output
+    assert "JSON format:" in mock_stream.call_args.args[0]
+    mock_structured.assert_not_called()
+    assert [quiz.question for quiz in quizzes] == ["Test?"]
+
+
+@pytest.mark.asyncio
+async def test_packed_requests_map_quizzes_back_to_their_chunks(mocker):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", chunks_per_request=2))
+    prompts = []
+
+    async def respond(prompt):
+        prompts.append(prompt)
+        for number, topic in re.findall(r"Document (\d+) \(\d+ questions\): This is (\w+)\.", prompt):
+            yield '{"question": "What is %s about?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R", "document": %s},' % (topic, number)
+        # A document number the request didn't have is dropped
+        yield '{"question": "Stray?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R", "document": 9}'
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    documents = [Document(page_content=f"This is {topic}.") for topic in ["biology", "chemistry", "physics"]]
+    chunks = [chunk async for chunk in quiz_generator.stream_from_documents(documents)]
+
+    assert len(prompts) == 2
+    assert "Document 2 (2 questions): This is chemistry." in prompts[0]
+    assert [chunk.index for chunk in chunks] == [0, 1, 2]
+    assert [[quiz.question for quiz in chunk.result] for chunk in chunks] == [
+        ["What is biology about?"], ["What is chemistry about?"], ["What is physics about?"]
+    ]
+    assert [chunk.result[0].source.chunk_id for chunk in chunks] == [0, 1, 2]
+
+
+def test_with_overrides_shares_model_client():
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test"))
+    overridden = quiz_generator.with_overrides(questions_per_chunk=5, max_concurrency=None)
+
+    assert overridden.config.questions_per_chunk == 5
+    assert quiz_generator.config.questions_per_chunk == 2
+    assert overridden.model is quiz_generator.model
+    assert quiz_generator.with_overrides() is quiz_generator
+
+    with pytest.raises(ValueError):
+        quiz_generator.with_overrides(model="gemini-1.5-pro")
+
+
 def test_merge_quizzes():
     quizzes = [
         Quiz(question="Q1?", options=["A", "B", "C", "D"], answer="A", reasoning="R1"),
@@ -20,4 +20,22 @@ def test_parse_quizzes_from_response(quiz_parser):
     
     # Assert that the quizzes were parsed correctly
     assert len(quizzes) == 1
-    assert isinstance(quizzes[0], Quiz)
\ No newline at end of file
+    assert isinstance(quizzes[0], Quiz)
+
+def test_stream_parser_emits_quizzes_across_split_pieces(quiz_parser):
+    response = 'Here you go: [{"question": "Is {x} a \\"set\\"?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}, {"question": "Q2?", "options": ["A", "B", "C", "D"], "answer": "B", "reasoning": "R"}]'
+    stream_parser = quiz_parser.stream()
+
+    quizzes = []
+    for start in range(0, len(response), 5):
+        quizzes.extend(stream_parser.feed(response[start:start + 5]))
+
+    assert [quiz.question for quiz in quizzes] == ['Is {x} a "set"?', "Q2?"]
+
+
+def test_parse_skips_invalid_and_truncated_quizzes(quiz_parser):
+    response = '[{"question": "Q1?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}, {"question": "Bad"}, {"question": "Q3?", "options": ["A"'
+
+    quizzes = quiz_parser.parse(response)
+
+    assert [quiz.question for quiz in quizzes] == ["Q1?"]
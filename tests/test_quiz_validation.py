@@ -0,0 +1,58 @@
+import pytest
+
+from src.parser import Quiz, QuizValidator
+
+
+@pytest.fixture
+def validator():
+    return QuizValidator()
+
+
+def make_quiz(**fields):
+    quiz = {"question": "What is the capital of France?", "options": ["Berlin", "Madrid", "Paris", "Rome"], "answer": "C", "reasoning": "Paris is the capital."}
+    quiz.update(fields)
+    return Quiz(**quiz)
+
+
+def test_valid_quiz_passes_unchanged(validator):
+    result = validator.validate(make_quiz())
+
+    assert result.accepted
+    assert not result.fixes
+    assert result.quiz == make_quiz()
+
+
+@pytest.mark.parametrize("answer", ["c", "(C)", "C.", "Option C", "Paris", "C. Paris"])
+def test_answer_is_normalized_to_its_letter(validator, answer):
+    result = validator.validate(make_quiz(answer=answer))
+
+    assert result.accepted
+    assert result.quiz.answer == "C"
+
+
+def test_option_labels_are_removed(validator):
+    result = validator.validate(make_quiz(options=["A. Berlin", "B. Madrid", "C. Paris", "D. Rome"]))
+
+    assert result.accepted
+    assert result.quiz.options == ["Berlin", "Madrid", "Paris", "Rome"]
+
+
+@pytest.mark.parametrize("fields, issue", [
+    ({"options": ["Berlin", "Madrid", "Paris"]}, "expected 4 options, got 3"),
+    ({"options": ["Berlin", "Paris", "paris", "Rome"]}, "duplicate options"),
+    ({"answer": "E"}, "is not A-D or one of the options"),
+    ({"answer": "Lyon"}, "is not A-D or one of the options"),
+    ({"reasoning": "  "}, "empty reasoning"),
+])
+def test_broken_quizzes_are_rejected_with_reason(validator, fields, issue):
+    result = validator.validate(make_quiz(**fields))
+
+    assert not result.accepted
+    assert any(issue in reported for reported in result.issues)
+
+
+def test_filter_splits_accepted_and_rejected(validator):
+    accepted, rejected = validator.filter([make_quiz(), make_quiz(answer="Lyon"), make_quiz(answer="Paris")])
+
+    assert len(accepted) == 2
+    assert len(rejected) == 1
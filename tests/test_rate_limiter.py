@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+
+from src.models.base import RateLimiter, TokenBucket, get_rate_limiter, is_retryable_error
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class ThrottledError(Exception):
+    status_code = 429
+
+
+def test_token_bucket_reports_wait_once_budget_is_spent():
+    bucket = TokenBucket(rate_per_minute=60)
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_is_retryable_error():
+    assert is_retryable_error(ThrottledError())
+    assert is_retryable_error(RuntimeError("503 Service Unavailable"))
+    assert not is_retryable_error(ValueError("invalid prompt"))
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retries_throttled_calls_and_lowers_concurrency():
+    limiter = RateLimiter(requests_per_minute=6000, max_concurrency=8, base_delay=0.001)
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ThrottledError("Too many requests")
+        return "ok"
+
+    assert await limiter.run(call) == "ok"
+    assert attempts == 3
+    assert limiter.concurrency < 8
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_does_not_retry_other_errors():
+    limiter = RateLimiter(requests_per_minute=6000, base_delay=0.001)
+
+    async def call():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await limiter.run(call)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_caps_in_flight_calls():
+    limiter = RateLimiter(requests_per_minute=6000, max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(limiter.run(call) for _ in range(10)))
+
+    assert peak <= 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_passes_on_slot_of_cancelled_waiter():
+    limiter = RateLimiter(requests_per_minute=6000, max_concurrency=1)
+
+    async def call():
+        return "done"
+
+    await limiter._acquire_slot()
+    first = asyncio.create_task(limiter.run(call))
+    second = asyncio.create_task(limiter.run(call))
+    await asyncio.sleep(0)
+
+    # The freed slot goes to the first waiter, which is cancelled before it gets to run
+    limiter._release_slot()
+    first.cancel()
+
+    assert await asyncio.wait_for(second, timeout=1) == "done"
+    assert first.cancelled()
+    assert limiter.in_flight == 0
+
+
+def test_get_rate_limiter_is_shared_per_key():
+    assert get_rate_limiter("test:model") is get_rate_limiter("test:model")
+    assert get_rate_limiter("test:model") is not get_rate_limiter("test:other")
@@ -0,0 +1,91 @@
+import time
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.models.base import BaseLLM
+from src.models.cache import InMemoryLRUCache, SQLiteCache, TieredCache, make_cache_key
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeChatModel:
+    temperature = 0
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        self.calls += 1
+        return AIMessage(content=f"response to {prompt}")
+
+
+class FakeLLM(BaseLLM):
+    def load_model(self, *args, **kwargs):
+        return FakeChatModel()
+
+    def generate(self, prompt, *args, **kwargs):
+        return self._invoke(prompt).content
+
+    async def a_generate(self, prompt, *args, **kwargs):
+        return (await self._ainvoke(prompt)).content
+
+    async def a_batch(self, prompts, *args, **kwargs):
+        return [await self._ainvoke(prompt) for prompt in prompts]
+
+    def get_model_name(self, *args, **kwargs):
+        return self.model_name
+
+
+def test_cache_key_depends_on_model_prompt_and_params():
+    key = make_cache_key("gemini-pro", "prompt", {"temperature": 0})
+
+    assert key == make_cache_key("gemini-pro", "prompt", {"temperature": 0})
+    assert key != make_cache_key("gemini-1.5-pro", "prompt", {"temperature": 0})
+    assert key != make_cache_key("gemini-pro", "other prompt", {"temperature": 0})
+    assert key != make_cache_key("gemini-pro", "prompt", {"temperature": 1})
+
+
+def test_in_memory_cache_evicts_least_recently_used_and_expired():
+    cache = InMemoryLRUCache(max_entries=2, ttl=None)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    expiring = InMemoryLRUCache(ttl=0.01)
+    expiring.set("a", "1")
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_sqlite_cache_persists_and_caps_size(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteCache(path, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    reopened = SQLiteCache(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("c") == "C"
+
+    tiered = TieredCache(InMemoryLRUCache(), reopened)
+    assert tiered.get("c") == "C"
+    assert tiered.memory.get("c") == "C"
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_answered_from_cache():
+    llm = FakeLLM("fake-model")
+    llm.cache = InMemoryLRUCache()
+
+    first = await llm.a_generate("prompt")
+    second = await llm.a_generate("prompt")
+    batch = await llm.a_batch(["prompt", "another prompt"])
+
+    assert first == second == batch[0].content
+    assert llm.model.calls == 2
+    assert llm.cache.stats()["hits"] == 2
+    assert llm.cache.stats()["misses"] == 2
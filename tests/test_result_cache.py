@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator.result_cache import QuizResultCache
+from src.parser import Quiz
+
+pytest_plugins = ('pytest_asyncio',)
+
+QUIZZES = [Quiz(question="Q1?", options=["A", "B", "C", "D"], answer="A", reasoning="R1")]
+
+
+def test_key_depends_on_content_and_config():
+    key = QuizResultCache.make_key("abc", QuizGeneratorConfig())
+
+    assert key == QuizResultCache.make_key("abc", QuizGeneratorConfig(api_key="secret"))
+    assert key != QuizResultCache.make_key("abd", QuizGeneratorConfig())
+    assert key != QuizResultCache.make_key("abc", QuizGeneratorConfig(max_concurrency=1))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_computation():
+    cache = QuizResultCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return QUIZZES
+
+    results = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+    assert all(result == QUIZZES for result in results)
+
+    assert await cache.get_or_compute("key", compute) == QUIZZES
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    cache = QuizResultCache()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def compute():
+        return QUIZZES
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("key", fail)
+    assert await cache.get_or_compute("key", compute) == QUIZZES
+
+
+@pytest.mark.asyncio
+async def test_waiting_request_takes_over_when_the_computing_one_is_cancelled():
+    cache = QuizResultCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return QUIZZES
+
+    leader = asyncio.create_task(cache.get_or_compute("key", compute))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+
+    assert leader.cancelled()
+    assert all(result == QUIZZES for result in results)
+    # The first follower computed the result again, the others shared it
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_does_not_disturb_the_computation():
+    cache = QuizResultCache()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return QUIZZES
+
+    leader = asyncio.create_task(cache.get_or_compute("key", compute))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_compute("key", compute))
+    await asyncio.sleep(0.01)
+
+    follower.cancel()
+
+    assert await leader == QUIZZES
+    assert follower.cancelled()
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import QuizGenerator
+from src.models.base import BaseEmbeddingModel
+from src.retrieval import ChunkRetriever
+
+pytest_plugins = ('pytest_asyncio',)
+
+VOCABULARY = ["photosynthesis", "chlorophyll", "light", "war", "treaty", "empire", "protein", "enzyme"]
+
+
+class FakeEmbedding(BaseEmbeddingModel):
+    """Counts vocabulary words, so texts sharing words are close."""
+
+    def __init__(self):
+        super().__init__("fake-embedding")
+        self.embedded = 0
+
+    def load_model(self, *args, **kwargs):
+        return None
+
+    def embed_text(self, text, *args, **kwargs):
+        self.embedded += 1
+        words = text.lower().split()
+        return [float(sum(word.strip(".,") == term for word in words)) for term in VOCABULARY]
+
+    async def a_embed_text(self, text, *args, **kwargs):
+        return self.embed_text(text)
+
+    def embed_texts(self, texts, *args, **kwargs):
+        return [self.embed_text(text) for text in texts]
+
+    async def a_embed_texts(self, texts, *args, **kwargs):
+        return self.embed_texts(texts)
+
+    def get_model_name(self, *args, **kwargs):
+        return self.model_name
+
+
+DOCUMENTS = [
+    Document(page_content="Photosynthesis uses light and chlorophyll.", metadata={"chunk_id": 0}),
+    Document(page_content="The war ended with a treaty.", metadata={"chunk_id": 1}),
+    Document(page_content="Chlorophyll absorbs light.", metadata={"chunk_id": 2}),
+    Document(page_content="An enzyme is a protein.", metadata={"chunk_id": 3}),
+]
+
+
+@pytest.mark.asyncio
+async def test_retrieves_topic_chunks_in_document_order(tmp_path):
+    retriever = ChunkRetriever(FakeEmbedding(), tmp_path)
+
+    chunks = await retriever.aretrieve(DOCUMENTS, "light and chlorophyll", k=2)
+
+    assert [chunk.metadata["chunk_id"] for chunk in chunks] == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_chunk_embeddings_are_stored_once_per_document(tmp_path):
+    embedding = FakeEmbedding()
+    retriever = ChunkRetriever(embedding, tmp_path)
+
+    await retriever.aretrieve(DOCUMENTS, "treaty", k=1)
+    embedded_once = embedding.embedded
+    chunks = await ChunkRetriever(embedding, tmp_path).aretrieve(DOCUMENTS, "treaty", k=1)
+
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+    assert embedding.embedded == embedded_once + 1
+    assert chunks[0].metadata["chunk_id"] == 1
+
+
+def test_concurrent_writers_of_one_index_do_not_clash(tmp_path, monkeypatch):
+    savez = np.savez
+
+    def slow_savez(*args, **kwargs):
+        savez(*args, **kwargs)
+        # Hold the written file back, so the other writers finish theirs in the meantime
+        time.sleep(0.05)
+
+    monkeypatch.setattr(np, "savez", slow_savez)
+
+    def index():
+        # Every writer has its own event loop, as separate server processes would
+        return asyncio.run(ChunkRetriever(FakeEmbedding(), tmp_path).aindex(DOCUMENTS))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        indexes = list(pool.map(lambda _: index(), range(4)))
+
+    assert all(len(index.documents) == len(DOCUMENTS) for index in indexes)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_on_topic_only_uses_retrieved_chunks(mocker, tmp_path):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", topic_top_k=1, index_path=str(tmp_path)))
+    mocker.patch.object(quiz_generator, '_build_embedding_model', return_value=FakeEmbedding())
+    mocker.patch.object(quiz_generator, 'load_document', return_value=DOCUMENTS)
+    prompts = []
+
+    async def respond(prompt):
+        prompts.append(prompt)
+        yield '[{"question": "What is an enzyme?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "R"}]'
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=respond)
+
+    quizzes = await quiz_generator.generate("document.pdf", topic="enzyme")
+
+    assert len(prompts) == 1
+    assert "An enzyme is a protein." in prompts[0]
+    assert quizzes[0].source.chunk_id == 3
+
+
+@pytest.mark.asyncio
+async def test_generator_copies_share_one_retriever(mocker, tmp_path):
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", index_path=str(tmp_path)))
+    threads = []
+
+    def build_embedding_model():
+        threads.append(threading.current_thread())
+        time.sleep(0.05)
+        return FakeEmbedding()
+
+    build = mocker.patch.object(quiz_generator, '_build_embedding_model', side_effect=build_embedding_model)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticker = asyncio.create_task(tick())
+    copies = [quiz_generator.with_overrides(questions_per_chunk=n) for n in (1, 2, 3)]
+    retrievers = await asyncio.gather(*(copy.get_retriever() for copy in copies))
+    ticker.cancel()
+    await asyncio.gather(ticker, return_exceptions=True)
+
+    # The model is loaded once, in a thread, while the event loop keeps serving other work
+    assert build.call_count == 1
+    assert threads[0] is not threading.main_thread()
+    assert ticks > 2
+    assert all(retriever is retrievers[0] for retriever in retrievers)
+    assert await quiz_generator.get_retriever() is retrievers[0]
@@ -0,0 +1,146 @@
+import asyncio
+import time
+import pytest
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import QuizGenerator
+from src.models import RouterLLM
+from src.models.base import BaseLLM
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeBackend(BaseLLM):
+    def __init__(self, name, latency=0.0, fail=False, release=None):
+        self.latency = latency
+        self.fail = fail
+        # Answers only once this event is set, when given
+        self.release = release
+        self.calls = 0
+        self.closed_streams = 0
+        super().__init__(name)
+
+    def load_model(self, *args, **kwargs):
+        return None
+
+    def generate(self, prompt, *args, **kwargs):
+        raise NotImplementedError
+
+    async def a_generate(self, prompt, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError(f"{self.model_name} is down")
+        return f"{self.model_name}: {prompt}"
+
+    async def a_batch(self, prompts, *args, **kwargs):
+        raise NotImplementedError
+
+    async def a_stream(self, prompt, *args, **kwargs):
+        try:
+            response = await self.a_generate(prompt)
+            for piece in response.split(" "):
+                yield piece
+        finally:
+            self.closed_streams += 1
+
+    def get_model_name(self, *args, **kwargs):
+        return self.model_name
+
+
+@pytest.mark.asyncio
+async def test_falls_back_and_benches_failing_backend():
+    down = FakeBackend("down", fail=True)
+    up = FakeBackend("up")
+    router = RouterLLM.from_backends([down, up], min_samples=2)
+
+    responses = [await router.a_generate(f"prompt {i}") for i in range(4)]
+
+    assert responses == [f"up: prompt {i}" for i in range(4)]
+    # After two failures the broken backend is cooling down and no longer tried first
+    assert down.calls == 2
+    assert router.ranked_backends()[0] is up
+
+
+@pytest.mark.asyncio
+async def test_prefers_faster_backend_once_measured():
+    slow = FakeBackend("slow")
+    fast = FakeBackend("fast")
+    router = RouterLLM.from_backends([slow, fast], min_samples=2)
+    for latency in [0.5, 0.6]:
+        router.stats[id(slow)].record(latency, ok=True)
+    for latency in [0.1, 0.2]:
+        router.stats[id(fast)].record(latency, ok=True)
+
+    await router.a_generate("prompt")
+
+    assert (slow.calls, fast.calls) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_request_to_second_backend():
+    stalled = FakeBackend("stalled", latency=5)
+    backup = FakeBackend("backup", latency=0.01)
+    router = RouterLLM.from_backends([stalled, backup], hedge_after=0.05)
+
+    start = time.perf_counter()
+    response = await router.a_generate("prompt")
+
+    assert response == "backup: prompt"
+    assert time.perf_counter() - start < 1
+    assert stalled.calls == backup.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_before_first_piece():
+    router = RouterLLM.from_backends([FakeBackend("down", fail=True), FakeBackend("up")])
+
+    pieces = [piece async for piece in router.a_stream("prompt")]
+
+    assert pieces == ["up:", "prompt"]
+
+
+@pytest.mark.asyncio
+async def test_stream_hedges_stalled_first_piece():
+    stalled = FakeBackend("stalled", latency=5)
+    backup = FakeBackend("backup", latency=0.01)
+    router = RouterLLM.from_backends([stalled, backup], hedge_after=0.05)
+
+    start = time.perf_counter()
+    pieces = [piece async for piece in router.a_stream("prompt")]
+
+    assert pieces == ["backup:", "prompt"]
+    assert time.perf_counter() - start < 1
+    # The stalled stream was cancelled once the backup answered
+    await asyncio.sleep(0)
+    assert stalled.closed_streams == backup.closed_streams == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_backends_that_answer_alongside_the_winner():
+    release = asyncio.Event()
+    first, second = FakeBackend("first", release=release), FakeBackend("second", release=release)
+    router = RouterLLM.from_backends([first, second], hedge_after=0.01)
+
+    async def answer_together():
+        # Both requests are in flight by now, and their first pieces arrive in the same turn of the loop
+        await asyncio.sleep(0.05)
+        release.set()
+
+    releaser = asyncio.create_task(answer_together())
+    pieces = [piece async for piece in router.a_stream("prompt")]
+    await releaser
+
+    assert pieces == ["first:", "prompt"]
+    assert first.calls == second.calls == 1
+    assert first.closed_streams == second.closed_streams == 1
+
+
+def test_generator_routes_over_fallback_providers():
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", fallback_providers=["groq"], provider_api_keys={"groq": "test"}))
+
+    assert isinstance(quiz_generator.model, RouterLLM)
+    assert [backend.get_model_name() for backend in quiz_generator.model.backends] == ["gemini-pro", "mixtral-8x7b-32768"]
+    assert quiz_generator.model.context_window == 32760
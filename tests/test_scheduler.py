@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+
+from src.generator.scheduler import ChunkScheduler
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_processes_every_item_within_concurrency_limit():
+    in_flight = 0
+    peak = 0
+
+    async def worker(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return item * 2
+
+    results = [chunk async for chunk in ChunkScheduler(max_concurrency=3).run(range(20), worker)]
+
+    assert sorted(chunk.result for chunk in results) == [i * 2 for i in range(20)]
+    assert peak <= 3
+    assert all(chunk.latency > 0 for chunk in results)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_yields_fast_chunks_first_and_keeps_errors():
+    async def worker(item):
+        if item == 0:
+            await asyncio.sleep(0.05)
+        if item == 2:
+            raise RuntimeError("boom")
+        return item
+
+    results = [chunk async for chunk in ChunkScheduler(max_concurrency=3).run(range(3), worker)]
+
+    assert results[-1].index == 0
+    failed = [chunk for chunk in results if not chunk.ok]
+    assert len(failed) == 1 and failed[0].index == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_starts_work_before_async_source_is_exhausted():
+    produced = []
+
+    async def source():
+        for item in range(5):
+            await asyncio.sleep(0.01)
+            produced.append(item)
+            yield item
+
+    async def worker(item):
+        return item
+
+    seen_when_first_done = None
+    results = []
+    async for chunk in ChunkScheduler(max_concurrency=2).run(source(), worker):
+        if seen_when_first_done is None:
+            seen_when_first_done = len(produced)
+        results.append(chunk.result)
+
+    assert sorted(results) == list(range(5))
+    assert seen_when_first_done < 5
+
+
+def test_scheduler_rejects_invalid_concurrency():
+    with pytest.raises(ValueError):
+        ChunkScheduler(max_concurrency=0)
@@ -0,0 +1,94 @@
+import hashlib
+import io
+import json
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from benchmarks.mock_llm import MockLLM
+from benchmarks.synthetic_pdf import make_pdf
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.generator import QuizGenerator
+from src import server
+from src.server import app, get_quiz_generator, save_upload
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def client():
+    config = QuizGeneratorConfig(api_key="test", pdf_workers=1, cache_enabled=False)
+    quiz_generator = QuizGenerator(config, model=MockLLM())
+    app.dependency_overrides[get_quiz_generator] = lambda: quiz_generator
+    # Not entered as a context manager, so the lifespan's real generator and job workers are not started
+    yield TestClient(app), quiz_generator
+    app.dependency_overrides.clear()
+
+
+def test_upload_stream_sends_quiz_events_then_a_summary(client, tmp_path, mocker):
+    client, quiz_generator = client
+    stream = quiz_generator.model.a_stream
+
+    def a_stream(prompt, *args, **kwargs):
+        if "Section 2" in str(prompt):
+            raise RuntimeError("provider down")
+        return stream(prompt, *args, **kwargs)
+
+    mocker.patch.object(quiz_generator.model, 'a_stream', side_effect=a_stream)
+    pdf_path = make_pdf(tmp_path / "doc.pdf", 3)
+
+    response = client.post("/upload/stream", files={"file": ("doc.pdf", pdf_path.read_bytes(), "application/pdf")})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    quizzes = [data for event, data in events if event == "quiz"]
+    # Three one-page chunks, the second of which fails
+    assert len(quizzes) == 2 * quiz_generator.config.questions_per_chunk
+    assert all(set(quiz) >= {"question", "options", "answer", "reasoning"} for quiz in quizzes)
+    event, summary = events[-1]
+    assert event == "summary"
+    assert summary["quizzes"] == len(quizzes)
+    assert summary["chunks"] == 3
+    assert summary["failed_chunks"] == 1
+
+
+def test_upload_stream_rejects_other_file_types(client):
+    client, _ = client
+    response = client.post("/upload/stream", files={"file": ("notes.txt", b"text", "text/plain")})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_save_upload_returns_path_and_sha256(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(server, "UPLOAD_CHUNK_SIZE", 1000)
+    content = bytes(range(256)) * 20
+
+    filepath, content_hash = await save_upload(UploadFile(io.BytesIO(content), filename="doc.pdf"))
+
+    assert content_hash == hashlib.sha256(content).hexdigest()
+    with open(filepath, "rb") as saved:
+        assert saved.read() == content
+    assert [str(path) for path in tmp_path.iterdir()] == [filepath]
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_large_files_without_leaving_a_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(server, "UPLOAD_CHUNK_SIZE", 1000)
+
+    with pytest.raises(HTTPException) as error:
+        await save_upload(UploadFile(io.BytesIO(b"x" * 5000), filename="doc.pdf"), max_size=2500)
+
+    assert error.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,76 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.models.base import BaseLLM, to_tool_schema
+from src.models.cache import InMemoryLRUCache
+from src.parser import QuizList
+
+pytest_plugins = ('pytest_asyncio',)
+
+QUIZZES = {"quizzes": [{"question": "Test?", "options": ["A", "B", "C", "D"], "answer": "A", "reasoning": "Because"}]}
+
+
+class FakeBoundModel:
+    def __init__(self, tool_calls):
+        self.tool_calls = tool_calls
+        self.calls = 0
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        self.calls += 1
+        return AIMessage(content="", tool_calls=self.tool_calls)
+
+
+class FakeStructuredLLM(BaseLLM):
+    supports_structured_output = True
+
+    def __init__(self, tool_calls):
+        super().__init__("fake-model")
+        self.bound = FakeBoundModel(tool_calls)
+
+    def load_model(self, *args, **kwargs):
+        return None
+
+    def bind_schema(self, schema):
+        return self.bound
+
+    def generate(self, prompt, *args, **kwargs):
+        raise NotImplementedError
+
+    async def a_generate(self, prompt, *args, **kwargs):
+        raise NotImplementedError
+
+    async def a_batch(self, prompts, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_model_name(self, *args, **kwargs):
+        return self.model_name
+
+
+def test_tool_schema_is_self_contained():
+    tool = to_tool_schema(QuizList)
+    parameters = tool["function"]["parameters"]
+
+    assert tool["function"]["name"] == "QuizList"
+    assert "$defs" not in parameters and "$ref" not in str(parameters)
+    assert set(parameters["properties"]["quizzes"]["items"]["properties"]) == {"question", "options", "answer", "reasoning"}
+
+
+@pytest.mark.asyncio
+async def test_structured_responses_are_validated_and_cached():
+    llm = FakeStructuredLLM([{"name": "QuizList", "args": QUIZZES, "id": "1"}])
+    llm.cache = InMemoryLRUCache()
+
+    first = await llm.a_generate_structured("prompt", QuizList)
+    second = await llm.a_generate_structured("prompt", QuizList)
+
+    assert first == second == QuizList(**QUIZZES)
+    assert llm.bound.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_structured_response_without_valid_call_is_none():
+    missing = FakeStructuredLLM([])
+    invalid = FakeStructuredLLM([{"name": "QuizList", "args": {"quizzes": [{"question": "Test?"}]}, "id": "1"}])
+
+    assert await missing.a_generate_structured("prompt", QuizList) is None
+    assert await invalid.a_generate_structured("prompt", QuizList) is None
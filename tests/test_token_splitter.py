@@ -0,0 +1,44 @@
+from langchain_core.documents import Document
+
+from src.config.quiz_generation import QuizGeneratorConfig
+from src.document_loaders.splitter import TokenBudgetSplitter
+from src.generator import QuizGenerator
+from src.models.base import estimate_tokens
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_packs_paragraphs_across_pages_up_to_budget():
+    pages = [
+        Document(page_content="one two three\n\nfour five", metadata={"page": 0}),
+        Document(page_content="six seven\n\neight nine ten eleven", metadata={"page": 1}),
+        Document(page_content="twelve", metadata={"page": 2}),
+    ]
+
+    chunks = TokenBudgetSplitter(7, count_words).split_documents(pages)
+
+    assert [chunk.page_content.split() for chunk in chunks] == [
+        ["one", "two", "three", "four", "five", "six", "seven"],
+        ["eight", "nine", "ten", "eleven", "twelve"],
+    ]
+    assert [(chunk.metadata["page"], chunk.metadata["page_end"]) for chunk in chunks] == [(0, 1), (1, 2)]
+
+
+def test_cuts_paragraphs_longer_than_budget():
+    page = Document(page_content=" ".join(str(i) for i in range(25)), metadata={"page": 0})
+
+    chunks = TokenBudgetSplitter(10, count_words).split_documents([page])
+
+    assert all(count_words(chunk.page_content) <= 10 for chunk in chunks)
+    assert " ".join(chunk.page_content for chunk in chunks).split() == page.page_content.split()
+
+
+def test_generator_sizes_chunks_from_model_context_window():
+    quiz_generator = QuizGenerator(QuizGeneratorConfig(api_key="test", chunk_context_share=0.5))
+    capped = QuizGenerator(QuizGeneratorConfig(api_key="test", chunk_context_share=0.5, max_chunk_tokens=2000))
+
+    prompt = quiz_generator.prompt_template.format(document="", number=2)
+    assert quiz_generator.text_splitter.chunk_tokens < 32760 // 2 - estimate_tokens(prompt)
+    assert capped.text_splitter.chunk_tokens == 2000
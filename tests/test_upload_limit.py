@@ -0,0 +1,46 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from src.server import UploadSizeLimitMiddleware
+
+
+def make_client(max_size=1024):
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_size=max_size)
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(await file.read())
+        return {"size": len(received[-1])}
+
+    return TestClient(app), received
+
+
+def test_small_upload_passes():
+    client, received = make_client()
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 100)})
+
+    assert response.status_code == 200
+    assert received == [b"x" * 100]
+
+
+def test_large_content_length_is_rejected_before_parsing():
+    client, received = make_client()
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 4096)})
+
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_large_chunked_body_is_rejected_while_streaming():
+    client, received = make_client()
+
+    def body():
+        for _ in range(8):
+            yield b"x" * 512
+
+    response = client.post("/upload", content=body(), headers={"Content-Type": "multipart/form-data; boundary=abc"})
+
+    assert response.status_code == 413
+    assert received == []